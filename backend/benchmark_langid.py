@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark the n-gram language ID model against the keyword heuristic
+Reports accuracy on langid_data/eval.tsv and microseconds per message
+"""
+
+import time
+from collections import Counter
+
+from language_detection import classify_language
+from ngram_langid import get_model, load_eval_set
+
+
+def evaluate(name, predict, samples, repeats=200):
+    """Print accuracy and mean latency of ``predict`` over ``samples``"""
+    correct = Counter()
+    totals = Counter()
+    misses = []
+    for language, text in samples:
+        predicted = predict(text)
+        totals[language] += 1
+        if predicted == language:
+            correct[language] += 1
+        else:
+            misses.append((language, predicted, text))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for _, text in samples:
+            predict(text)
+    elapsed = time.perf_counter() - start
+    per_message_us = elapsed / (repeats * len(samples)) * 1e6
+
+    overall = sum(correct.values()) / len(samples)
+    print(f"\n📊 {name}")
+    print(f"   Accuracy: {overall:.1%} ({sum(correct.values())}/{len(samples)})")
+    for language in sorted(totals):
+        print(f"   - {language:<9} {correct[language]}/{totals[language]}")
+    print(f"   Latency:  {per_message_us:.1f} µs/message")
+    for language, predicted, text in misses:
+        print(f"   ✗ expected {language}, got {predicted}: {text}")
+
+
+def main():
+    samples = load_eval_set()
+    model = get_model()
+    if model is None:
+        print("❌ Model not trained. Run: python ngram_langid.py")
+        return
+
+    print(f"🔍 Evaluating on {len(samples)} held-out messages")
+    evaluate("Keyword heuristic", lambda t: classify_language(t, use_model=False).language, samples)
+    evaluate("N-gram model only", lambda t: model.classify(t)[0], samples)
+    evaluate("Combined detector (default)", lambda t: classify_language(t).language, samples)
+
+
+if __name__ == "__main__":
+    main()
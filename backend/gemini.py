@@ -1,16 +1,19 @@
 import google.generativeai as genai
 import json
 import datetime
-from fpdf import FPDF
 import os
-import re
 from typing import List, Dict
 from dotenv import load_dotenv
+from gemini_client import get_client
+from language_detection import detect_language
+from response_cache import get_response_cache
+from report_renderer import render_report
 class ChildAssessmentBot:
     def __init__(self, api_key: str):
         """Initialize the assessment bot with Gemini API"""
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.client = get_client('gemini-2.0-flash-exp')
+        self.response_cache = get_response_cache()
         self.conversation_history = []
         self.child_responses = []
         self.question_count = 0
@@ -72,40 +75,7 @@ class ChildAssessmentBot:
 
     def detect_language(self, text: str) -> str:
         """Detect the primary language of the input text"""
-        # Hindi unicode range detection
-        hindi_chars = len(re.findall(r'[\u0900-\u097F]', text))
-        
-        # English alphabet detection
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        
-        # Common Hinglish words (Hindi words written in English)
-        hinglish_words = [
-            'hai', 'hoon', 'mein', 'tumhara', 'tumhari', 'mera', 'meri', 'kya', 'kaun', 'kahan', 
-            'kab', 'kyun', 'kaise', 'achha', 'accha', 'theek', 'thik', 'nahi', 'nahin', 'haan',
-            'ji', 'bhai', 'didi', 'yaar', 'dost', 'ghar', 'school', 'padhna', 'padhai', 'exam',
-            'teacher', 'sir', 'madam', 'mummy', 'papa', 'family', 'friends', 'matlab', 'samjha',
-            'samjhi', 'pata', 'maloom', 'dekho', 'suno', 'bolo', 'karo', 'jana', 'aana', 'khana',
-            'paani', 'time', 'bas', 'bilkul', 'sach', 'jhooth', 'kitna', 'kitni', 'bohot', 'bahut'
-        ]
-        
-        # Convert to lowercase for checking
-        text_lower = text.lower()
-        hinglish_count = sum(1 for word in hinglish_words if word in text_lower)
-        
-        total_chars = hindi_chars + english_chars
-        
-        if total_chars == 0:
-            return "mixed"
-        
-        # Determine language based on character distribution and hinglish words
-        if hindi_chars > 0 and hindi_chars / total_chars > 0.3:
-            return "hindi"
-        elif hinglish_count >= 2 or (hinglish_count >= 1 and english_chars > 0):
-            return "hinglish"
-        elif english_chars > 0:
-            return "english"
-        else:
-            return "mixed"
+        return detect_language(text)
 
     def get_initial_question(self) -> str:
         """Get the initial question in appropriate language"""
@@ -158,8 +128,11 @@ class ChildAssessmentBot:
                 context=context
             ) + f"\n\nChild's response (in {self.detected_language}): {user_response}\n\nProvide your next question or response in the SAME language pattern (Question #{self.question_count + 1}):"
             
-            response = self.model.generate_content(prompt)
-            ai_response = response.text.strip()
+            # First-turn answers are highly repetitive, so try the cache before Gemini
+            ai_response = self.response_cache.get(user_response, self.detected_language, first_turn=True)
+            if ai_response is None:
+                ai_response = self.client.generate_text(prompt)
+                self.response_cache.put(user_response, self.detected_language, ai_response, first_turn=True)
             
             # Store conversation
             self.conversation_history.append({
@@ -228,8 +201,7 @@ class ChildAssessmentBot:
                     context=context
                 ) + f"\n\nChild's latest response (in {current_lang}): {user_response}\n\nProvide your next question or response in the SAME language as the child used (Question #{self.question_count + 1}):"
                 
-                response = self.model.generate_content(prompt)
-                ai_response = response.text.strip()
+                ai_response = self.client.generate_text(prompt)
                 
                 # Store conversation
                 self.conversation_history.append({
@@ -318,8 +290,7 @@ class ChildAssessmentBot:
         """
         
         try:
-            response = self.model.generate_content(assessment_prompt)
-            assessment_text = response.text.strip()
+            assessment_text = self.client.generate_text(assessment_prompt)
             
             # Generate reports
             self.save_assessment_report(assessment_text)
@@ -365,62 +336,17 @@ class ChildAssessmentBot:
             print(f"TXT report saved as: {txt_filename}")
     
     def create_multilingual_pdf_report(self, assessment_text: str, timestamp: str):
-        """Create PDF report with basic multilingual support"""
+        """Create PDF report with Unicode (Devanagari) fonts, see report_renderer.py"""
         try:
-            from fpdf import FPDF
-            
-            class MultilingualPDF(FPDF):
-                def header(self):
-                    self.set_font('Arial', 'B', 15)
-                    self.cell(0, 10, 'Child Development Assessment Report', 0, 1, 'C')
-                    self.ln(5)
-            
-            pdf = MultilingualPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            
-            # Basic info
-            pdf.cell(0, 10, f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True)
-            pdf.cell(0, 10, f"Primary Language: {self.detected_language}", ln=True)
-            pdf.cell(0, 10, f"Language Pattern: {self.language_pattern}", ln=True)
-            pdf.ln(5)
-            
-            # Conversation responses
-            pdf.set_font("Arial", "B", 14)
-            pdf.cell(0, 10, "Conversation Responses:", ln=True)
-            pdf.set_font("Arial", size=10)
-            
-            for i, response in enumerate(self.child_responses, 1):
-                pdf.ln(3)
-                # Handle both English and transliterated text
-                response_text = f"Q{i} ({response.get('detected_language', 'unknown')}): {response['response']}"
-                # Convert non-ASCII characters for PDF compatibility
-                safe_text = response_text.encode('ascii', 'ignore').decode('ascii')
-                if len(safe_text) < len(response_text):
-                    safe_text += " [Contains multilingual text - see TXT file for complete version]"
-                pdf.multi_cell(0, 5, safe_text)
-            
-            pdf.ln(10)
-            
-            # Assessment results
-            pdf.set_font("Arial", "B", 14)
-            pdf.cell(0, 10, "Assessment Results:", ln=True)
-            pdf.set_font("Arial", size=10)
-            
-            # Handle assessment text
-            assessment_lines = assessment_text.split('\n')
-            for line in assessment_lines:
-                if line.strip():
-                    # Convert non-ASCII characters for PDF compatibility
-                    safe_line = line.encode('ascii', 'ignore').decode('ascii')
-                    if len(safe_line) < len(line):
-                        safe_line += " [Multilingual content - see TXT file]"
-                    pdf.multi_cell(0, 5, safe_line)
-            
-            pdf_filename = f"child_assessment_{timestamp}.pdf"
-            pdf.output(pdf_filename)
-            print(f"Reports saved as: {pdf_filename} and {txt_filename}")
-            print("Note: For complete multilingual content, please refer to the TXT file.")
+            data = {
+                "date": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "detected_language": self.detected_language,
+                "language_pattern": self.language_pattern,
+                "responses": self.child_responses,
+                "assessment": assessment_text,
+            }
+            pdf_filename = render_report("assessment", data, f"child_assessment_{timestamp}.pdf")
+            print(f"Reports saved as: {pdf_filename} and child_assessment_{timestamp}.txt")
             
         except Exception as e:
             print(f"PDF creation error: {e}")
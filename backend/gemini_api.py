@@ -1,12 +1,15 @@
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import google.generativeai as genai
 import os
-import re
 import logging
 from dotenv import load_dotenv
+from gemini_client import EmptyResponseError, get_client
+from language_detection import detect_language
+from response_cache import get_response_cache
 
 # Load environment variables
 load_dotenv()
@@ -45,7 +48,8 @@ if not api_key:
 
 try:
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-2.0-flash-exp")
+    client = get_client("gemini-2.0-flash-exp")
+    response_cache = get_response_cache()
     logger.info("Gemini API configured successfully")
 except Exception as e:
     logger.error(f"Failed to configure Gemini API: {e}")
@@ -55,48 +59,19 @@ except Exception as e:
 class ChatRequest(BaseModel):
     message: str
 
-def detect_language(text: str) -> str:
-    """Detect the primary language of the input text"""
-    # Hindi unicode range detection
-    hindi_chars = len(re.findall(r'[\u0900-\u097F]', text))
-
-    # English alphabet detection
-    english_chars = len(re.findall(r'[a-zA-Z]', text))
-
-    # Common Hinglish words (Hindi words written in English)
-    hinglish_words = [
-        'hai', 'hoon', 'mein', 'tumhara', 'tumhari', 'mera', 'meri', 'kya', 'kaun', 'kahan',
-        'kab', 'kyun', 'kaise', 'achha', 'accha', 'theek', 'thik', 'nahi', 'nahin', 'haan',
-        'ji', 'bhai', 'didi', 'yaar', 'dost', 'ghar', 'school', 'padhna', 'padhai', 'exam',
-        'teacher', 'sir', 'madam', 'mummy', 'papa', 'family', 'friends', 'matlab', 'samjha',
-        'samjhi', 'pata', 'maloom', 'dekho', 'suno', 'bolo', 'karo', 'jana', 'aana', 'khana',
-        'paani', 'time', 'bas', 'bilkul', 'sach', 'jhooth', 'kitna', 'kitni', 'bohot', 'bahut'
-    ]
-
-    # Convert to lowercase for checking
-    text_lower = text.lower()
-    hinglish_count = sum(1 for word in hinglish_words if word in text_lower)
-
-    total_chars = hindi_chars + english_chars
-
-    if total_chars == 0:
-        return "mixed"
-
-    # Determine language based on character distribution and hinglish words
-    if hindi_chars > 0 and hindi_chars / total_chars > 0.3:
-        return "hindi"
-    elif hinglish_count >= 2 or (hinglish_count >= 1 and english_chars > 0):
-        return "hinglish"
-    elif english_chars > 0:
-        return "english"
-    else:
-        return "mixed"
-
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
+    detected_language = "english"
     try:
-        # Detect the language of the user's message
-        detected_language = detect_language(request.message)
+        # Detect the language of the user's message once and reuse it below
+        if request.message:
+            detected_language = detect_language(request.message)
+
+        # Short, repetitive messages ("I am fine", "theek hoon") skip Gemini on a cache hit
+        cached_reply = response_cache.get(request.message, detected_language)
+        if cached_reply:
+            logger.info(f"Served cached response for language: {detected_language}")
+            return {"response": cached_reply}
 
         # Create language-specific prompt
         prompt = f"""
@@ -122,23 +97,22 @@ async def chat_endpoint(request: ChatRequest):
         - If child says "मैं ठीक हूँ" → respond in Hindi like "बहुत अच्छा! आज कुछ खास किया?"
         """
 
-        response = model.generate_content(prompt)
-
-        if not response or not response.text:
+        try:
+            response = await client.generate_text_async(prompt)
+        except EmptyResponseError:
             logger.warning("Empty response from Gemini API")
-            detected_lang = detect_language(request.message) if request.message else "english"
             error_messages = {
                 "english": "I couldn't generate a response. Please try again.",
                 "hindi": "मैं कोई उत्तर नहीं दे सका। कृपया पुनः प्रयास करें।",
                 "hinglish": "Main koi jawab nahi de saka. Please try again.",
                 "mixed": "Main कोई jawab नहीं दे सका। Please try again."
             }
-            error_msg = error_messages.get(detected_lang, error_messages["english"])
+            error_msg = error_messages.get(detected_language, error_messages["english"])
             return {"response": error_msg}
 
-        detected_lang = detect_language(request.message) if request.message else "english"
-        logger.info(f"Successfully generated response for language: {detected_lang}")
-        return {"response": response.text.strip()}
+        response_cache.put(request.message, detected_language, response)
+        logger.info(f"Successfully generated response for language: {detected_language}")
+        return {"response": response}
 
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}")
@@ -151,8 +125,7 @@ async def chat_endpoint(request: ChatRequest):
             "mixed": "Oops! कुछ गलत हो गया। Please try again later."
         }
 
-        detected_lang = detect_language(request.message) if request.message else "english"
-        error_msg = error_messages.get(detected_lang, error_messages["english"])
+        error_msg = error_messages.get(detected_language, error_messages["english"])
 
         return {"response": error_msg}
 
@@ -161,19 +134,21 @@ async def chat_endpoint(request: ChatRequest):
 async def health_check():
     """Health check endpoint to verify API is running"""
     try:
-        # Test if Gemini API is accessible
-        test_response = model.generate_content("Hello")
+        # Test if Gemini API is accessible: a single attempt, off the event loop
+        await run_in_threadpool(client.ping)
         return {
             "status": "healthy",
             "message": "Gemini API is working properly",
-            "gemini_api": "connected"
+            "gemini_api": "connected",
+            "circuit_breaker": client.breaker.state
         }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         return {
             "status": "unhealthy",
             "message": "Gemini API connection failed",
-            "error": str(e)
+            "error": str(e),
+            "circuit_breaker": client.breaker.state
         }
 
 @app.get("/")
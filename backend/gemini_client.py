@@ -0,0 +1,253 @@
+"""
+Resilient Gemini client shared by the chat API, the assessment bot and the
+PDF report generator.
+
+Wraps ``GenerativeModel.generate_content`` with a per-call timeout, jittered
+exponential backoff for throttling (429) and server (5xx) errors, a circuit
+breaker and a process-wide concurrency cap, so upstream throttling turns into
+short waits instead of instant failures or hung requests.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+import google.generativeai as genai
+
+from rate_limiter import PRIORITY_INTERACTIVE, RateLimiter, RateLimitTimeout, estimate_tokens, get_limiter
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+DEFAULT_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+DEFAULT_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini call fails after all retries"""
+
+
+class GeminiUnavailableError(GeminiError):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+class GeminiTimeoutError(GeminiError):
+    """Raised when a single Gemini call exceeds its timeout"""
+
+
+class EmptyResponseError(GeminiError):
+    """Raised when Gemini answers without any usable text"""
+
+
+class CircuitBreaker:
+    """Minimal closed/open/half-open circuit breaker
+
+    Once ``reset_timeout`` has passed, a half-open breaker lets exactly one
+    trial call through; everyone else is rejected until that call's outcome
+    closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _current(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current()
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go upstream right now (only the one trial call when half-open)"""
+        with self._lock:
+            state = self._current()
+            if state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return state != self.OPEN
+
+    def release_probe(self):
+        """The trial call ended without a verdict on upstream health; let another caller probe"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Gemini circuit breaker opened after %d failures", self._failures)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Return True for throttling, transient server errors and timeouts"""
+    if isinstance(exc, (GeminiTimeoutError, FutureTimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    # google.api_core exceptions expose the HTTP status as ``code``
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    return False
+
+
+# One semaphore for the whole process: every caller shares a single API key
+_concurrency = threading.BoundedSemaphore(DEFAULT_MAX_CONCURRENCY)
+# Twice the cap, so calls abandoned after a timeout don't hold up fresh ones
+_executor = ThreadPoolExecutor(max_workers=2 * DEFAULT_MAX_CONCURRENCY, thread_name_prefix="gemini")
+
+
+class GeminiClient:
+    """Retrying, rate-bounded wrapper around a ``GenerativeModel``"""
+
+    def __init__(
+        self,
+        model,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 20.0,
+        breaker: Optional[CircuitBreaker] = None,
+        semaphore: Optional[threading.Semaphore] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.semaphore = semaphore or _concurrency
+        self.limiter = limiter or get_limiter()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _call_once(self, prompt, **kwargs):
+        if not self.semaphore.acquire(timeout=self.timeout):
+            raise GeminiTimeoutError("Timed out waiting for a free Gemini slot")
+        released = threading.Lock()
+
+        def release(_=None):
+            # Once, when the call finishes or when we stop waiting for it, whichever comes first
+            if released.acquire(blocking=False):
+                self.semaphore.release()
+
+        future = _executor.submit(self.model.generate_content, prompt, **kwargs)
+        future.add_done_callback(release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A hung call gives its slot back now instead of starving retries and other callers
+            future.cancel()
+            release()
+            raise GeminiTimeoutError(f"Gemini call exceeded {self.timeout}s")
+
+    def generate_content(self, prompt, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Call ``generate_content`` with rate limiting, timeout, retries and circuit breaking.
+
+        ``priority`` selects the rate-limiter lane: interactive callers wait at
+        most ``timeout`` for quota, batch callers wait as long as it takes.
+        """
+        tokens = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        quota_timeout = self.timeout if priority == PRIORITY_INTERACTIVE else None
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                raise GeminiUnavailableError("Gemini circuit breaker is open")
+            try:
+                self.limiter.acquire(tokens, priority=priority, timeout=quota_timeout)
+            except RateLimitTimeout as e:
+                # Our own quota, not an upstream failure: no retry and no breaker failure
+                self.breaker.release_probe()
+                raise GeminiError(f"Gemini call failed: {e}") from e
+            try:
+                response = self._call_once(prompt, **kwargs)
+            except Exception as e:
+                last_error = e
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release_probe()
+                if not retryable or attempt == self.max_retries:
+                    break
+                delay = self._backoff(attempt)
+                logger.warning(f"Gemini call failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return response
+        raise GeminiError(f"Gemini call failed: {last_error}") from last_error
+
+    def ping(self, prompt="Hello"):
+        """One attempt for health checks: no retries, and the breaker is left alone.
+
+        A failing upstream is reported at once instead of after the backoff
+        schedule, and health probes don't open (or close) the breaker that
+        guards real traffic. The call still counts against the shared quota.
+        """
+        self.limiter.acquire(estimate_tokens(prompt), timeout=self.timeout)
+        return self._call_once(prompt)
+
+    def generate_text(self, prompt, **kwargs) -> str:
+        """Return the stripped response text, raising EmptyResponseError if empty"""
+        response = self.generate_content(prompt, **kwargs)
+        try:
+            text = response.text if response else ""
+        except ValueError:
+            # Blocked or candidate-less responses raise on ``.text``
+            text = ""
+        if not text or not text.strip():
+            raise EmptyResponseError("Empty response from Gemini API")
+        return text.strip()
+
+    async def generate_text_async(self, prompt, **kwargs) -> str:
+        """Async variant of ``generate_text`` that keeps the event loop free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.generate_text(prompt, **kwargs))
+
+
+_clients: Dict[str, GeminiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(model_name: str, **kwargs) -> GeminiClient:
+    """Return the shared client for ``model_name`` (genai must be configured)"""
+    with _clients_lock:
+        client = _clients.get(model_name)
+        if client is None:
+            client = GeminiClient(genai.GenerativeModel(model_name), **kwargs)
+            _clients[model_name] = client
+        return client
@@ -0,0 +1,81 @@
+"""
+Shared language detector for English, Hindi (Devanagari) and Hinglish.
+
+Used by the chat API, the assessment bot, the mock server and the
+prompt-engineering variants, which all used to carry their own copy.
+The text is scanned once with a precompiled pattern; romanized words are
+looked up in a set, so 'hai' no longer matches inside 'chair'. Latin-script
+text without a known Hindi word is handed to the character n-gram model in
+``ngram_langid`` so romanized Hindi outside the word list is still caught.
+"""
+
+import re
+from typing import NamedTuple
+
+from ngram_langid import get_model
+
+# Devanagari runs and Latin runs, matched in a single scan of the text
+_WORD_RE = re.compile(r"([\u0900-\u097F]+)|([A-Za-z]+)")
+
+# Common Hindi words written in English script
+HINGLISH_WORDS = frozenset([
+    'hai', 'hoon', 'mein', 'tumhara', 'tumhari', 'mera', 'meri', 'kya', 'kaun', 'kahan',
+    'kab', 'kyun', 'kaise', 'achha', 'accha', 'theek', 'thik', 'nahi', 'nahin', 'haan',
+    'ji', 'bhai', 'didi', 'yaar', 'dost', 'ghar', 'padhna', 'padhai', 'matlab', 'samjha',
+    'samjhi', 'pata', 'maloom', 'dekho', 'suno', 'bolo', 'karo', 'jana', 'aana', 'khana',
+    'paani', 'bas', 'bilkul', 'sach', 'jhooth', 'kitna', 'kitni', 'bohot', 'bahut',
+])
+
+# Loanwords used just as often in plain English sentences; they only
+# support a Hinglish label when a Hindi-only word is also present
+SHARED_WORDS = frozenset([
+    'school', 'exam', 'teacher', 'sir', 'madam', 'mummy', 'papa', 'family', 'friends', 'time',
+])
+
+
+class LanguageResult(NamedTuple):
+    language: str
+    confidence: float
+
+
+def classify_language(text: str, use_model: bool = True) -> LanguageResult:
+    """Classify text as english, hindi, hinglish or mixed with a 0-1 confidence
+
+    With ``use_model=False`` only the keyword heuristic is used.
+    """
+    hindi_chars = english_chars = 0
+    latin_words = hinglish_hits = shared_hits = 0
+
+    for match in _WORD_RE.finditer(text):
+        devanagari, latin = match.groups()
+        if devanagari:
+            hindi_chars += len(devanagari)
+            continue
+        english_chars += len(latin)
+        latin_words += 1
+        word = latin.lower()
+        if word in HINGLISH_WORDS:
+            hinglish_hits += 1
+        elif word in SHARED_WORDS:
+            shared_hits += 1
+
+    total_chars = hindi_chars + english_chars
+    if total_chars == 0:
+        return LanguageResult("mixed", 0.0)
+
+    hindi_share = hindi_chars / total_chars
+    if hindi_chars > 0 and hindi_share > 0.3:
+        return LanguageResult("hindi", round(hindi_share, 3))
+    if hinglish_hits:
+        return LanguageResult("hinglish", round(min(1.0, 0.5 + (hinglish_hits + shared_hits) / latin_words), 3))
+
+    model = get_model() if use_model else None
+    if model is not None:
+        language, confidence = model.classify(text, candidates=("english", "hinglish"))
+        return LanguageResult(language, confidence)
+    return LanguageResult("english", round(1.0 - hindi_share, 3))
+
+
+def detect_language(text: str) -> str:
+    """Detect the primary language of the input text"""
+    return classify_language(text).language
@@ -8,10 +8,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
-import re
 import random
 import time
 
+from language_detection import detect_language
+
 app = FastAPI(title="Mock Gemini Chat API", version="1.0.0")
 
 # CORS configuration
@@ -32,25 +33,6 @@ app.add_middleware(
 class ChatRequest(BaseModel):
     message: str
 
-def detect_language(text):
-    """Detect language of input text"""
-    # Hindi characters
-    hindi_pattern = r'[\u0900-\u097F]+'
-    # English words
-    english_pattern = r'[a-zA-Z]+'
-    
-    has_hindi = bool(re.search(hindi_pattern, text))
-    has_english = bool(re.search(english_pattern, text))
-    
-    if has_hindi and has_english:
-        return "mixed"
-    elif has_hindi:
-        return "hindi"
-    elif has_english:
-        return "english"
-    else:
-        return "english"
-
 def generate_mock_response(message, language):
     """Generate mock AI responses based on language"""
     
@@ -79,6 +61,10 @@ def generate_mock_response(message, language):
         ]
     }
     
+    # Hinglish shares the code-mixed canned replies
+    if language == "hinglish":
+        language = "mixed"
+
     # Get appropriate responses for the detected language
     lang_responses = responses.get(language, responses["english"])
     
@@ -157,6 +143,8 @@ async def chat(request: ChatRequest):
         }
         
         detected_lang = detect_language(request.message) if request.message else "english"
+        if detected_lang == "hinglish":
+            detected_lang = "mixed"
         error_msg = error_messages.get(detected_lang, error_messages["english"])
         
         return {"response": error_msg}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Character n-gram language identification for English, Hindi and Hinglish.
+
+A multinomial naive Bayes model over hashed character 1-4 grams. The trained
+log-probabilities live in one flat ``array('f')`` (buckets x languages) that
+is written to ``langid_data/ngram_langid.bin`` and loaded with a single
+``fromfile`` call, so scoring a chat message takes microseconds and needs no
+third-party packages.
+
+Retrain after editing the corpus in ``langid_data/``:
+    python ngram_langid.py
+"""
+
+import math
+import os
+import struct
+import threading
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "langid_data")
+MODEL_PATH = os.path.join(DATA_DIR, "ngram_langid.bin")
+
+LANGUAGES = ("english", "hinglish", "hindi")
+
+# Per-n-gram log-likelihood bonus: Latin-script chat is mostly English, so
+# romanized Hindi has to win by a clear margin before it is labelled Hinglish
+LANGUAGE_BIAS = {"english": 0.25}
+
+# Scale applied to per-n-gram scores before the softmax that yields confidence
+CONFIDENCE_SCALE = 4.0
+
+_MAX_CACHED_NGRAMS = 200_000
+
+_MAGIC = b"LID1"
+_HEADER = struct.Struct("<4sIBBB")
+
+
+def ngrams(text: str, min_n: int = 1, max_n: int = 4) -> List[str]:
+    """Return character n-grams of the lowercased, space-padded text"""
+    padded = " " + " ".join(text.lower().split()) + " "
+    length = len(padded)
+    return [padded[i:i + n] for n in range(min_n, max_n + 1) for i in range(length - n + 1)]
+
+
+class NgramLanguageModel:
+    """Hashed character n-gram naive Bayes classifier"""
+
+    def __init__(self, table: array, n_buckets: int, languages=LANGUAGES, min_n: int = 1, max_n: int = 4):
+        self.table = table
+        self.n_buckets = n_buckets
+        self.languages = tuple(languages)
+        self.min_n = min_n
+        self.max_n = max_n
+        self._mask = n_buckets - 1
+        # n-gram -> per-language log-probs; chat vocabulary is small, so this stays bounded
+        self._rows: Dict[str, Tuple[float, ...]] = {}
+
+    @classmethod
+    def train(cls, samples: List[Tuple[str, str]], n_buckets: int = 1 << 13,
+              alpha: float = 0.1, min_n: int = 1, max_n: int = 4) -> "NgramLanguageModel":
+        """Train from ``(language, text)`` pairs; ``n_buckets`` must be a power of two"""
+        if n_buckets & (n_buckets - 1):
+            raise ValueError("n_buckets must be a power of two")
+        n_langs = len(LANGUAGES)
+        counts = [[0.0] * n_buckets for _ in range(n_langs)]
+        mask = n_buckets - 1
+        for language, text in samples:
+            row = counts[LANGUAGES.index(language)]
+            for gram in ngrams(text, min_n, max_n):
+                row[zlib.crc32(gram.encode("utf-8")) & mask] += 1
+
+        # Interleave languages per bucket so scoring reads adjacent floats
+        table = array("f", bytes(4 * n_buckets * n_langs))
+        for li, row in enumerate(counts):
+            log_total = math.log(sum(row) + alpha * n_buckets)
+            for bucket, count in enumerate(row):
+                table[bucket * n_langs + li] = math.log(count + alpha) - log_total
+        return cls(table, n_buckets, LANGUAGES, min_n, max_n)
+
+    def _row(self, gram: str) -> Tuple[float, ...]:
+        n_langs = len(self.languages)
+        base = (zlib.crc32(gram.encode("utf-8")) & self._mask) * n_langs
+        row = tuple(self.table[base:base + n_langs])
+        if len(self._rows) < _MAX_CACHED_NGRAMS:
+            self._rows[gram] = row
+        return row
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Return mean log-likelihood per n-gram for each language"""
+        grams = ngrams(text, self.min_n, self.max_n)
+        if not grams:
+            return dict.fromkeys(self.languages, 0.0)
+        get = self._rows.get
+        rows = [get(gram) or self._row(gram) for gram in grams]
+        count = len(rows)
+        return {lang: sum(column) / count for lang, column in zip(self.languages, zip(*rows))}
+
+    def classify(self, text: str, candidates: Optional[Tuple[str, ...]] = None) -> Tuple[str, float]:
+        """Return the best language (optionally among ``candidates``) and its confidence"""
+        scores = self.scores(text)
+        if candidates:
+            scores = {lang: scores[lang] for lang in candidates}
+        scores = {lang: score + LANGUAGE_BIAS.get(lang, 0.0) for lang, score in scores.items()}
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        norm = sum(math.exp(CONFIDENCE_SCALE * (s - top)) for s in scores.values())
+        return best, round(1.0 / norm, 3)
+
+    def save(self, path: str = MODEL_PATH):
+        names = "\n".join(self.languages).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.n_buckets, self.min_n, self.max_n, len(self.languages)))
+            f.write(struct.pack("<H", len(names)))
+            f.write(names)
+            self.table.tofile(f)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "NgramLanguageModel":
+        with open(path, "rb") as f:
+            magic, n_buckets, min_n, max_n, n_langs = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a language ID model: {path}")
+            (name_len,) = struct.unpack("<H", f.read(2))
+            languages = f.read(name_len).decode("utf-8").split("\n")
+            table = array("f")
+            table.fromfile(f, n_buckets * n_langs)
+        return cls(table, n_buckets, languages, min_n, max_n)
+
+
+def load_corpus(data_dir: str = DATA_DIR) -> List[Tuple[str, str]]:
+    """Read ``train_<language>.txt`` files as ``(language, line)`` pairs"""
+    samples = []
+    for language in LANGUAGES:
+        with open(os.path.join(data_dir, f"train_{language}.txt"), encoding="utf-8") as f:
+            samples.extend((language, line.strip()) for line in f if line.strip())
+    return samples
+
+
+def load_eval_set(data_dir: str = DATA_DIR) -> List[Tuple[str, str]]:
+    """Read the held-out ``eval.tsv`` as ``(language, text)`` pairs"""
+    with open(os.path.join(data_dir, "eval.tsv"), encoding="utf-8") as f:
+        return [tuple(line.rstrip("\n").split("\t", 1)) for line in f if line.strip()]
+
+
+_model: Optional[NgramLanguageModel] = None
+_model_lock = threading.Lock()
+_model_missing = False
+
+
+def get_model() -> Optional[NgramLanguageModel]:
+    """Return the bundled model, or None if it has not been trained"""
+    global _model, _model_missing
+    if _model is None and not _model_missing:
+        with _model_lock:
+            if _model is None and not _model_missing:
+                try:
+                    _model = NgramLanguageModel.load()
+                except (OSError, ValueError):
+                    _model_missing = True
+    return _model
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    model = NgramLanguageModel.train(corpus)
+    model.save()
+    print(f"✅ Trained on {len(corpus)} sentences, saved {MODEL_PATH}")
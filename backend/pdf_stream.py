@@ -0,0 +1,215 @@
+"""
+Streaming assembly of one PDF from many rendered blocks.
+
+fpdf keeps a whole document in memory until ``output()``. StreamingPdfWriter
+instead takes already rendered PDFs (a block of pages from the renderer, or a
+per-student PDF on disk) one at a time and copies their objects straight into
+the output file, renumbered, without re-rendering or decompressing anything.
+Only the current block and the output's offset table are held in memory, so
+a consolidated report over every student stays bounded.
+
+Inputs must use a classic xref table (what fpdf writes); PDFs with
+cross-reference or object streams are rejected.
+"""
+
+import mmap
+import os
+import re
+from typing import Dict, List, Tuple, Union
+
+_REF = re.compile(rb'\((?:\\.|[^\\)])*\)|(\d+)\s+(\d+)\s+R\b', re.S)
+_OBJ_HEADER = re.compile(rb'(\d+)\s+(\d+)\s+obj\b')
+_LENGTH = re.compile(rb'/Length\s+(\d+)(?:\s+(\d+)\s+R)?')
+# Page attributes a page may inherit from its /Pages node
+_INHERITABLE = (b"MediaBox", b"CropBox", b"Rotate", b"Resources")
+
+# Object numbers reserved in the output for the page tree root and the catalog
+PAGES_ID = 1
+CATALOG_ID = 2
+
+
+class PdfSource:
+    """Random access to the objects of one PDF through its xref table"""
+
+    def __init__(self, data):
+        self.data = data
+        start = data.rfind(b"startxref")
+        if start < 0:
+            raise ValueError("not a PDF: no startxref")
+        xref_at = int(data[start + 9:start + 40].split()[0])
+        if data[xref_at:xref_at + 4] != b"xref":
+            raise ValueError("PDFs with cross-reference streams are not supported")
+        self.offsets, self.trailer = self._read_xref(xref_at)
+
+    def _read_xref(self, at: int) -> Tuple[Dict[int, int], bytes]:
+        offsets: Dict[int, int] = {}
+        end = self.data.find(b"trailer", at)
+        lines = self.data[at + 4:end].split()
+        i = 0
+        while i < len(lines):
+            first, count = int(lines[i]), int(lines[i + 1])
+            i += 2
+            for n in range(first, first + count):
+                offset, _, kind = lines[i:i + 3]
+                if kind == b"n":
+                    offsets[n] = int(offset)
+                i += 3
+        trailer_end = self.data.find(b"startxref", end)
+        return offsets, bytes(self.data[end:trailer_end])
+
+    def object(self, number: int) -> Tuple[bytes, Union[bytes, None]]:
+        """(dictionary or value, stream data or None) of object ``number``"""
+        at = self.offsets[number]
+        header = _OBJ_HEADER.match(self.data, at)
+        if header is None or int(header.group(1)) != number:
+            raise ValueError(f"bad xref offset for object {number}")
+        body_at = header.end()
+        stream_at = self.data.find(b"stream", body_at)
+        end_at = self.data.find(b"endobj", body_at)
+        if stream_at < 0 or stream_at > end_at:
+            return bytes(self.data[body_at:end_at]).strip(), None
+
+        head = bytes(self.data[body_at:stream_at]).strip()
+        length = _LENGTH.search(head)
+        if length.group(2) is not None:
+            size = int(self.object(int(length.group(1)))[0])
+        else:
+            size = int(length.group(1))
+        data_at = stream_at + 6
+        data_at += 2 if self.data[data_at:data_at + 2] == b"\r\n" else 1
+        if b"/ObjStm" in head:
+            raise ValueError("PDFs with object streams are not supported")
+        return head, self.data[data_at:data_at + size]
+
+    def ref(self, text: bytes, key: bytes) -> Union[int, None]:
+        match = re.search(rb"/" + key + rb"\s+(\d+)\s+\d+\s+R", text)
+        return int(match.group(1)) if match else None
+
+    def pages(self) -> Tuple[List[int], Dict[int, Dict[bytes, bytes]], List[int]]:
+        """(page objects in order, inherited attributes per page, page tree nodes)"""
+        catalog = self.object(self.ref(self.trailer, b"Root"))[0]
+        pages: List[int] = []
+        inherited: Dict[int, Dict[bytes, bytes]] = {}
+        nodes: List[int] = []
+
+        def walk(number: int, attributes: Dict[bytes, bytes]):
+            text = self.object(number)[0]
+            if re.search(rb"/Type\s*/Pages\b", text):
+                nodes.append(number)
+                attributes = dict(attributes)
+                for key in _INHERITABLE:
+                    value = _value(text, key)
+                    if value is not None:
+                        attributes[key] = value
+                kids = re.search(rb"/Kids\s*\[([^\]]*)\]", text).group(1)
+                for kid in re.findall(rb"(\d+)\s+\d+\s+R", kids):
+                    walk(int(kid), attributes)
+            else:
+                pages.append(number)
+                inherited[number] = {k: v for k, v in attributes.items() if _value(text, k) is None}
+
+        walk(self.ref(catalog, b"Pages"), {})
+        return pages, inherited, nodes
+
+
+def _value(text: bytes, key: bytes) -> Union[bytes, None]:
+    """Direct value of ``/key`` in a dictionary: an array, a reference or a number"""
+    match = re.search(rb"/" + key + rb"\s*(\[[^\]]*\]|\d+\s+\d+\s+R|-?\d+(?:\.\d+)?)", text)
+    return match.group(1) if match else None
+
+
+class StreamingPdfWriter:
+    """Append rendered PDFs to one output file; finished pages go straight to disk
+
+    Use as a context manager: the file is written to ``<path>.part`` and moved
+    into place on a clean exit, or removed if an error was raised.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._partial = path + ".part"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(self._partial, "wb")
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets: List[int] = [0, 0, 0]  # objects 1 and 2 are written by close()
+        self._kids: List[int] = []
+
+    @property
+    def page_count(self) -> int:
+        return len(self._kids)
+
+    def _start_object(self) -> int:
+        self._offsets.append(self._file.tell())
+        return len(self._offsets) - 1
+
+    def append(self, pdf: Union[str, bytes, bytearray]) -> int:
+        """Copy every page of ``pdf`` (a path or the PDF's bytes); returns the pages added"""
+        if isinstance(pdf, str):
+            with open(pdf, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self._append(PdfSource(data))
+        return self._append(PdfSource(bytes(pdf)))
+
+    def _append(self, source: PdfSource) -> int:
+        pages, inherited, nodes = source.pages()
+        skipped = set(nodes)
+        skipped.add(source.ref(source.trailer, b"Root"))
+        skipped.add(source.ref(source.trailer, b"Info"))
+        copied = [n for n in sorted(source.offsets) if n not in skipped]
+        base = len(self._offsets)
+        numbers = {old: base + i for i, old in enumerate(copied)}
+        numbers.update({node: PAGES_ID for node in nodes})
+
+        def renumber(text: bytes) -> bytes:
+            def sub(match):
+                if match.group(1) is None:
+                    return match.group(0)  # a string literal, left as is
+                new = numbers.get(int(match.group(1)))
+                return b"null" if new is None else b"%d 0 R" % new
+            return _REF.sub(sub, text)
+
+        for old in copied:
+            head, stream = source.object(old)
+            if old in inherited:
+                extra = b"".join(b"\n/" + k + b" " + v for k, v in inherited[old].items())
+                head = head.replace(b"<<", b"<<" + extra, 1)
+            number = self._start_object()
+            self._file.write(b"%d 0 obj\n" % number + renumber(head))
+            if stream is not None:
+                self._file.write(b"\nstream\n")
+                self._file.write(stream)
+                self._file.write(b"\nendstream")
+            self._file.write(b"\nendobj\n")
+
+        self._kids.extend(numbers[p] for p in pages)
+        return len(pages)
+
+    def close(self):
+        """Write the page tree, catalog and xref table and move the file into place"""
+        f = self._file
+        self._offsets[PAGES_ID] = f.tell()
+        kids = b" ".join(b"%d 0 R" % k for k in self._kids)
+        f.write(b"%d 0 obj\n<<\n/Type /Pages\n/Kids [%s]\n/Count %d\n>>\nendobj\n"
+                % (PAGES_ID, kids, len(self._kids)))
+        self._offsets[CATALOG_ID] = f.tell()
+        f.write(b"%d 0 obj\n<<\n/Type /Catalog\n/Pages %d 0 R\n>>\nendobj\n" % (CATALOG_ID, PAGES_ID))
+        xref_at = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % len(self._offsets))
+        f.write(b"".join(b"%010d 00000 n \n" % offset for offset in self._offsets[1:]))
+        f.write(b"trailer\n<<\n/Size %d\n/Root %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(self._offsets), CATALOG_ID, xref_at))
+        f.close()
+        os.replace(self._partial, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,190 @@
+"""
+Client-side rate limiting for the shared GEMINI_API_KEY.
+
+Two token buckets are kept per key: one for requests per minute and one for
+tokens per minute. State lives in process memory by default, or in a small
+SQLite file (``GEMINI_RATE_LIMIT_DB``) so the chat API, the assessment bot and
+the PDF generator running as separate processes draw from the same quota.
+
+Callers queue in priority lanes: interactive chats are always served before
+batch report generation, and batch work may not dip into a reserve of the
+bucket kept for interactive traffic.
+"""
+
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# Fraction of each bucket that batch callers must leave for interactive ones
+DEFAULT_BATCH_RESERVE = 0.2
+
+DEFAULT_RPM = float(os.getenv("GEMINI_RPM", "15"))
+DEFAULT_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a caller could not get quota within its timeout"""
+
+
+def estimate_tokens(text: str, output_tokens: int = 256) -> int:
+    """Rough token estimate (~4 characters per token) plus expected output"""
+    return max(1, len(text) // 4) + output_tokens
+
+
+def _refill_and_take(state: Tuple[float, float, float], now: float, rpm: float, tpm: float,
+                     tokens: float, reserve: float) -> Tuple[Tuple[float, float, float], float]:
+    """Refill both buckets and try to take one request plus ``tokens``.
+
+    ``state`` is ``(request_level, token_level, last_update)``. Returns the new
+    state and the number of seconds to wait (0 means the quota was taken).
+    """
+    req_level, tok_level, updated = state
+    elapsed = max(0.0, now - updated)
+    req_level = min(rpm, req_level + elapsed * rpm / 60.0)
+    tok_level = min(tpm, tok_level + elapsed * tpm / 60.0)
+
+    # Never ask for more than a full bucket, or the caller would wait forever
+    tokens = min(tokens, tpm * (1 - reserve))
+    req_needed = 1 + rpm * reserve
+    tok_needed = tokens + tpm * reserve
+
+    if req_level >= req_needed and tok_level >= tok_needed:
+        return (req_level - 1, tok_level - tokens, now), 0.0
+
+    wait = max((req_needed - req_level) * 60.0 / rpm, (tok_needed - tok_level) * 60.0 / tpm)
+    return (req_level, tok_level, now), max(wait, 0.001)
+
+
+class MemoryBucketStore:
+    """Bucket state held in this process only"""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._state = (rpm, tpm, time.time())
+        self._lock = threading.Lock()
+
+    def take(self, tokens: float, reserve: float) -> float:
+        with self._lock:
+            self._state, wait = _refill_and_take(self._state, time.time(), self.rpm, self.tpm, tokens, reserve)
+            return wait
+
+
+class SQLiteBucketStore:
+    """Bucket state shared across processes through a SQLite file"""
+
+    def __init__(self, path: str, rpm: float, tpm: float, key: str = "gemini"):
+        self.path = path
+        self.rpm = rpm
+        self.tpm = tpm
+        self.key = key
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                "key TEXT PRIMARY KEY, requests REAL, tokens REAL, updated REAL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_buckets VALUES (?, ?, ?, ?)",
+                (key, rpm, tpm, time.time()),
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def take(self, tokens: float, reserve: float) -> float:
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front so read-modify-write is atomic
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT requests, tokens, updated FROM rate_buckets WHERE key = ?", (self.key,)
+            ).fetchone()
+            state = row if row else (self.rpm, self.tpm, time.time())
+            state, wait = _refill_and_take(state, time.time(), self.rpm, self.tpm, tokens, reserve)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets VALUES (?, ?, ?, ?)", (self.key,) + state
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+class RateLimiter:
+    """Priority-queued token-bucket limiter for requests and tokens per minute"""
+
+    def __init__(self, store, batch_reserve: float = DEFAULT_BATCH_RESERVE):
+        self.store = store
+        self.batch_reserve = batch_reserve
+        self._waiters = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: int = 0, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None):
+        """Block until one request and ``tokens`` tokens are available.
+
+        Lower ``priority`` values are served first; equal priorities are FIFO.
+        Raises RateLimitTimeout if ``timeout`` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reserve = self.batch_reserve if priority > PRIORITY_INTERACTIVE else 0.0
+        ticket = (priority, next(self._counter))
+
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    wait = None
+                    if self._waiters[0] == ticket:
+                        wait = self.store.take(tokens, reserve)
+                        if wait == 0:
+                            heapq.heappop(self._waiters)
+                            self._cond.notify_all()
+                            return
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitTimeout("Timed out waiting for Gemini quota")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    # Re-check periodically: other processes may free shared quota
+                    self._cond.wait(timeout=min(wait, 1.0) if wait is not None else 1.0)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(key: str = "gemini") -> RateLimiter:
+    """Return the process-wide limiter, SQLite-backed if GEMINI_RATE_LIMIT_DB is set"""
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            db_path = os.getenv("GEMINI_RATE_LIMIT_DB")
+            if db_path:
+                store = SQLiteBucketStore(db_path, DEFAULT_RPM, DEFAULT_TPM, key=key)
+            else:
+                store = MemoryBucketStore(DEFAULT_RPM, DEFAULT_TPM)
+            limiter = RateLimiter(store)
+            _limiters[key] = limiter
+        return limiter
@@ -0,0 +1,378 @@
+"""
+PDF rendering shared by the admin health reports and the assessment bot.
+
+Documents are built from a small set of layout templates (``TEMPLATES``) on
+a common ``ReportPDF`` page template with Unicode TrueType fonts. A
+Devanagari font is registered as a fallback, so Hindi and Hinglish text is
+embedded as-is instead of being stripped to ASCII. None is bundled: without
+one, rendering Hindi text raises MissingFontError rather than writing a PDF
+with the text missing. Fonts are looked up once
+per process (``REPORT_FONT``, ``REPORT_BOLD_FONT`` and
+``REPORT_DEVANAGARI_FONT`` override the search of ``REPORT_FONT_DIR`` and the
+usual system font folders) and cut down once to the scripts the reports use
+(Latin, Devanagari, punctuation), which roughly halves the time fpdf spends
+parsing fonts for every document. The compact copies are cached in
+``REPORT_FONT_CACHE_DIR``; ``REPORT_FONT_SUBSET=0`` embeds the full fonts.
+
+render_batch() renders many documents (per center, per student) in a
+process pool; each worker resolves fonts once and reuses the templates for
+every document it renders. stream_report() assembles one long PDF from
+rendered blocks and earlier PDFs, page by page (see pdf_stream.py).
+
+    python report_renderer.py assessments.jsonl --output-dir reports --workers 4 --combined all.pdf
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from fpdf import FPDF
+
+from pdf_stream import StreamingPdfWriter
+
+logger = logging.getLogger(__name__)
+
+# Devanagari, Vedic extensions and Devanagari extended
+_DEVANAGARI_RE = re.compile("[\u0900-\u097f\u1cd0-\u1cff\ua8e0-\ua8ff]")
+
+
+class MissingFontError(RuntimeError):
+    """Raised for Hindi text when no Devanagari font is installed, instead of a PDF with the text missing"""
+
+UNICODE_FAMILY = "ReportSans"
+DEVANAGARI_FAMILY = "ReportDevanagari"
+# Built-in PDF font used only when no TrueType font is installed
+CORE_FAMILY = "Helvetica"
+
+# Candidate file names per role, most preferred first
+FONT_CANDIDATES = {
+    "regular": ["NotoSans-Regular.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf", "arialuni.ttf",
+                "Arial Unicode.ttf"],
+    "bold": ["NotoSans-Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf"],
+    "devanagari": ["NotoSansDevanagari-Regular.ttf", "NotoSerifDevanagari-Regular.ttf", "Lohit-Devanagari.ttf",
+                   "Nirmala.ttf", "mangal.ttf", "gargi.ttf", "Kalimati.ttf"],
+}
+FONT_ENV = {"regular": "REPORT_FONT", "bold": "REPORT_BOLD_FONT", "devanagari": "REPORT_DEVANAGARI_FONT"}
+FONT_DIRS = [
+    os.getenv("REPORT_FONT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+]
+
+FONT_CACHE_DIR = os.getenv("REPORT_FONT_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "fonts"))
+SUBSET_FONTS = os.getenv("REPORT_FONT_SUBSET", "1") != "0"
+# Code points kept in the compact fonts: Latin, Devanagari (+ Vedic and extended),
+# punctuation, currency (₹), letterlike symbols, arrows and shapes (incl. the dotted circle)
+FONT_SUBSET_RANGES = [(0x20, 0x24F), (0x900, 0x97F), (0x1CD0, 0x1CFF), (0x2000, 0x206F), (0x20A0, 0x20CF),
+                      (0x2100, 0x214F), (0x2190, 0x21FF), (0x25A0, 0x25FF), (0xA8E0, 0xA8FF)]
+
+
+@functools.lru_cache(maxsize=None)
+def find_fonts() -> Dict[str, Optional[str]]:
+    """Path of the regular, bold and Devanagari font to use (None if not found)"""
+    installed: Dict[str, str] = {}
+    for directory in FONT_DIRS:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                installed.setdefault(name.lower(), os.path.join(root, name))
+
+    fonts: Dict[str, Optional[str]] = {}
+    for role, candidates in FONT_CANDIDATES.items():
+        override = os.getenv(FONT_ENV[role])
+        if override and os.path.exists(override):
+            fonts[role] = override
+        else:
+            fonts[role] = next((installed[c.lower()] for c in candidates if c.lower() in installed), None)
+    if not fonts["regular"]:
+        logger.warning("No Unicode TrueType font found; set REPORT_FONT. Non Latin-1 text will show as '?'")
+    elif not fonts["devanagari"]:
+        logger.warning("No Devanagari font found; set REPORT_DEVANAGARI_FONT. Reports with Hindi text will fail")
+    return fonts
+
+
+def compact_font(path: str) -> str:
+    """A copy of ``path`` with only the FONT_SUBSET_RANGES glyphs, cached by source path, size and mtime"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    stat = os.stat(path)
+    tag = zlib.crc32(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    stem, ext = os.path.splitext(os.path.basename(path))
+    cached = os.path.join(FONT_CACHE_DIR, f"{stem}.{tag:08x}{ext}")
+    if not os.path.exists(cached):
+        options = subset.Options()
+        options.layout_features = ["*"]  # keep the GSUB/GPOS rules Devanagari shaping needs
+        options.name_IDs = ["*"]
+        options.notdef_outline = True
+        font = TTFont(path)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=[c for low, high in FONT_SUBSET_RANGES for c in range(low, high + 1)])
+        subsetter.subset(font)
+        os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+        # A partial file of its own, so threads and processes subsetting at once don't clobber each other
+        with tempfile.NamedTemporaryFile(dir=FONT_CACHE_DIR, prefix=os.path.basename(cached) + ".",
+                                         suffix=".part", delete=False) as partial:
+            font.save(partial)
+        os.replace(partial.name, cached)
+    return cached
+
+
+def _has_text_shaping() -> bool:
+    try:
+        import uharfbuzz  # noqa: F401  (needed by FPDF.set_text_shaping)
+    except ImportError:
+        return False
+    return True
+
+
+class ReportPDF(FPDF):
+    """Page template: title header, page-number footer and the report text styles"""
+
+    def __init__(self, title: str, fonts: Dict[str, Optional[str]], shaping: bool = False, first_page: int = 1):
+        super().__init__()
+        self.report_title = title
+        self.first_page = first_page
+        self.family_name = CORE_FAMILY
+        self.devanagari = bool(fonts.get("regular") and fonts.get("devanagari"))
+        if fonts.get("regular"):
+            self.add_font(UNICODE_FAMILY, "", fonts["regular"])
+            self.add_font(UNICODE_FAMILY, "B", fonts.get("bold") or fonts["regular"])
+            self.family_name = UNICODE_FAMILY
+            if fonts.get("devanagari"):
+                self.add_font(DEVANAGARI_FAMILY, "", fonts["devanagari"])
+                self.add_font(DEVANAGARI_FAMILY, "B", fonts["devanagari"])
+                # Characters missing from the main font (Hindi) are taken from here
+                self.set_fallback_fonts([DEVANAGARI_FAMILY])
+                if shaping:
+                    # Correct conjuncts and vowel signs for Devanagari
+                    self.set_text_shaping(True)
+        self.set_auto_page_break(auto=True, margin=15)
+
+    def text_for_font(self, text: str) -> str:
+        if not self.devanagari and _DEVANAGARI_RE.search(text):
+            raise MissingFontError("The report contains Hindi (Devanagari) text but no Devanagari font is installed; "
+                                   "set REPORT_DEVANAGARI_FONT or add e.g. NotoSansDevanagari-Regular.ttf to "
+                                   "REPORT_FONT_DIR")
+        if self.family_name == CORE_FAMILY:
+            return text.encode("latin-1", "replace").decode("latin-1")
+        return text
+
+    def header(self):
+        self.set_font(self.family_name, "B", 15)
+        self.cell(0, 10, self.text_for_font(self.report_title), align="C", new_x="LMARGIN", new_y="NEXT")
+        self.ln(5)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font(self.family_name, "", 8)
+        self.cell(0, 10, f"Page {self.page_no() + self.first_page - 1}", align="C")
+
+    def heading(self, text: str, size: int = 14):
+        self.set_font(self.family_name, "B", size)
+        self.multi_cell(0, 10, self.text_for_font(text), new_x="LMARGIN", new_y="NEXT")
+
+    def paragraph(self, text: str, size: int = 10, height: float = 5):
+        self.set_font(self.family_name, "", size)
+        self.multi_cell(0, height, self.text_for_font(text), new_x="LMARGIN", new_y="NEXT")
+
+
+def health_template(pdf: ReportPDF, data: Dict):
+    """Gemini narrative followed by the flagged students grouped by center and class
+
+    ``data``: ``narrative`` (str) and ``flagged`` (list of ``{"heading", "lines"}``).
+    Either may be left out to render one block of a streamed report; the
+    ``flagged_title`` heading is only printed when given.
+    """
+    if "narrative" in data:
+        pdf.add_page()
+        # One multi_cell per text: it breaks lines itself, far faster than a call per line
+        pdf.paragraph(data["narrative"], size=12, height=10)
+
+    if "flagged" in data:
+        pdf.add_page()
+        if data.get("flagged_title"):
+            pdf.heading(data["flagged_title"])
+        for group in data["flagged"]:
+            pdf.heading(group["heading"], size=12)
+            pdf.paragraph("\n".join(group["lines"]), size=11, height=8)
+
+
+def assessment_template(pdf: ReportPDF, data: Dict):
+    """One child's assessment: language info, conversation responses and results
+
+    ``data``: ``date``, ``detected_language``, ``language_pattern``, ``responses``
+    (list of ``{"response", "detected_language"}``) and ``assessment`` (str)
+    """
+    pdf.add_page()
+    if data.get("student"):
+        pdf.paragraph(f"Student: {data['student']}", size=12, height=10)
+    pdf.paragraph(f"Date: {data.get('date') or datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                  size=12, height=10)
+    pdf.paragraph(f"Primary Language: {data.get('detected_language', 'unknown')}", size=12, height=10)
+    pdf.paragraph(f"Language Pattern: {data.get('language_pattern', 'unknown')}", size=12, height=10)
+    pdf.ln(5)
+
+    pdf.heading("Conversation Responses:")
+    for i, response in enumerate(data.get("responses", []), 1):
+        pdf.ln(3)
+        pdf.paragraph(f"Q{i} ({response.get('detected_language', 'unknown')}): {response['response']}")
+    pdf.ln(10)
+
+    pdf.heading("Assessment Results:")
+    lines = [line for line in data.get("assessment", "").split("\n") if line.strip()]
+    if lines:
+        pdf.paragraph("\n".join(lines))
+
+
+TEMPLATES: Dict[str, Tuple[str, Callable[[ReportPDF, Dict], None]]] = {
+    "health": ("Diksha Foundation Health Report", health_template),
+    "assessment": ("Child Development Assessment Report", assessment_template),
+}
+
+
+class ReportRenderer:
+    """Fonts resolved once, then any number of documents from the templates"""
+
+    def __init__(self, fonts: Optional[Dict[str, Optional[str]]] = None, subset_fonts: bool = SUBSET_FONTS):
+        fonts = fonts if fonts is not None else find_fonts()
+        if subset_fonts:
+            fonts = {role: compact_font(path) if path else None for role, path in fonts.items()}
+        self.fonts = fonts
+        self.shaping = bool(self.fonts.get("devanagari")) and _has_text_shaping()
+
+    def document(self, template: str, data: Dict) -> ReportPDF:
+        default_title, build = TEMPLATES[template]
+        pdf = ReportPDF(data.get("title", default_title), self.fonts, self.shaping, data.get("first_page", 1))
+        build(pdf, data)
+        return pdf
+
+    def render(self, template: str, data: Dict, path: str) -> str:
+        """Write the document to ``path`` (atomically) and return the path"""
+        pdf = self.document(template, data)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        partial = path + ".part"
+        pdf.output(partial)
+        os.replace(partial, path)
+        return path
+
+
+_renderer: Optional[ReportRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> ReportRenderer:
+    """The renderer of this process, created once even when threads ask at the same time"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ReportRenderer()
+    return _renderer
+
+
+def render_report(template: str, data: Dict, path: str) -> str:
+    return get_renderer().render(template, data, path)
+
+
+def stream_report(path: str, blocks: Iterable[Union[str, Tuple[str, Dict]]]) -> int:
+    """Build one PDF at ``path`` from blocks, holding only one block in memory
+
+    A block is ``(template, data)``, rendered here with page numbers carried
+    on from the previous blocks, or the path of a PDF rendered earlier (for
+    example by render_batch), whose pages are copied in as they are.
+    ``blocks`` may be a generator. Returns the number of pages written.
+    """
+    renderer = get_renderer()
+    with StreamingPdfWriter(path) as writer:
+        for block in blocks:
+            if isinstance(block, str):
+                writer.append(block)
+            else:
+                template, data = block
+                pdf = renderer.document(template, dict(data, first_page=writer.page_count + 1))
+                writer.append(bytes(pdf.output()))
+    return writer.page_count
+
+
+def _render_job(job: Tuple[str, Dict, str]) -> Dict:
+    """Render one job; never raises, so one bad document can't stop a batch"""
+    template, data, path = job
+    start = time.perf_counter()
+    result = {"path": path, "error": None}
+    try:
+        render_report(template, data, path)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def render_batch(jobs: Iterable[Tuple[str, Dict, str]], workers: Optional[int] = None,
+                 progress: bool = True) -> List[Dict]:
+    """Render ``(template, data, path)`` jobs in a process pool; returns one result per job, in order"""
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    start = time.perf_counter()
+    # Compact fonts are written once here, not raced for by every worker
+    get_renderer()
+    results = []
+    if workers == 1:
+        results_iter = map(_render_job, jobs)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=get_renderer)
+        results_iter = pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+    try:
+        for done, result in enumerate(results_iter, 1):
+            results.append(result)
+            if progress and result["error"]:
+                print(f"[{done}/{len(jobs)}] ❌ {result['path']}: {result['error']}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if progress:
+        elapsed = time.perf_counter() - start
+        rendered = sum(1 for r in results if not r["error"])
+        print(f"📄 Rendered {rendered}/{len(jobs)} PDFs with {workers} workers in {elapsed:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render one assessment PDF per line of a JSONL file")
+    parser.add_argument("assessments", help="JSONL: student, detected_language, language_pattern, responses, assessment")
+    parser.add_argument("--output-dir", default="assessment_reports", help="where to write the PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--combined", help="also join all rendered PDFs into this file")
+    args = parser.parse_args()
+
+    with open(args.assessments, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    batch = []
+    for i, record in enumerate(records, 1):
+        name = "".join(c if c.isalnum() else "_" for c in str(record.get("student", i)))
+        batch.append(("assessment", record, os.path.join(args.output_dir, f"child_assessment_{name}.pdf")))
+    results = render_batch(batch, args.workers)
+    if args.combined:
+        pages = stream_report(args.combined, [r["path"] for r in results if not r["error"]])
+        print(f"📄 {args.combined}: {pages} pages")
+    sys.exit(1 if any(r["error"] for r in results) else 0)
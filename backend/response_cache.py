@@ -0,0 +1,202 @@
+"""
+Response cache for first-turn and trivially short chat messages.
+
+Every assessment opens with "How are you feeling today?" and the answers are
+highly repetitive ("I am fine", "theek hoon", "मैं ठीक हूँ"). Messages are
+normalized (case, punctuation, common spelling variants) and mapped to a small
+set of intents, then keyed on intent plus detected language. A hit returns
+one of several reply variants without a Gemini round trip; replies generated
+on a miss are added as new variants.
+"""
+
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+DEFAULT_HIT_RATIO = float(os.getenv("RESPONSE_CACHE_HIT_RATIO", "0.8"))
+DEFAULT_MAX_WORDS = int(os.getenv("RESPONSE_CACHE_MAX_WORDS", "4"))
+
+# ASCII punctuation plus the Devanagari danda and curly quotes; a plain [^\w]
+# would also strip Devanagari vowel signs, which are not alphanumeric
+_PUNCTUATION_RE = re.compile(r"[!-/:-@\[-`{-~\u0964\u0965\u2018\u2019\u201c\u201d\u2026]+")
+_SPACE_RE = re.compile(r"\s+")
+
+# Spelling variants folded onto one canonical token. Only unambiguous ones:
+# "mein"/"mai" are also written for "में" (in), so they are not folded onto
+# "main" (I); whole phrases using them are listed in INTENT_PHRASES instead
+_SPELLING = {
+    "im": "i am", "iam": "i am",
+    "thik": "theek", "thek": "theek", "tik": "theek",
+    "hu": "hoon", "hun": "hoon", "hoo": "hoon", "hoom": "hoon",
+    "acha": "accha", "achha": "accha", "acchha": "accha",
+    "bohot": "bahut", "bhot": "bahut", "boht": "bahut",
+    "nhi": "nahi", "nahin": "nahi", "nai": "nahi",
+    "हूं": "हूँ", "हु": "हूँ",
+    "मै": "मैं", "ठिक": "ठीक",
+}
+
+# Normalized phrases that mean the same thing as a first-turn answer
+INTENT_PHRASES: Dict[str, List[str]] = {
+    "feeling_good": [
+        "i am fine", "fine", "i am good", "good", "i am great", "great", "very good",
+        "i am fine thank you", "fine thank you", "i am doing well", "doing well",
+        "i am happy", "happy", "main theek hoon", "theek hoon", "main accha hoon",
+        "mein theek hoon", "mai theek hoon", "mein accha hoon", "mai accha hoon", "accha hoon",
+        "bahut accha", "mast", "ekdum mast", "badhiya",
+        "मैं ठीक हूँ", "ठीक हूँ", "मैं अच्छा हूँ", "अच्छा हूँ", "बहुत अच्छा", "मैं खुश हूँ",
+    ],
+    "feeling_okay": [
+        "ok", "okay", "i am ok", "i am okay", "not bad", "so so", "theek theek",
+        "theek hi hoon", "thoda theek", "ठीक ठाक", "ठीक ही हूँ",
+    ],
+    "feeling_bad": [
+        "not good", "i am sad", "sad", "i am not fine", "i am tired", "tired",
+        "accha nahi", "theek nahi hoon", "main udaas hoon", "mein udaas hoon", "mai udaas hoon", "udaas hoon",
+        "अच्छा नहीं", "मैं ठीक नहीं हूँ", "मैं उदास हूँ", "उदास हूँ",
+    ],
+}
+
+_PHRASE_TO_INTENT = {phrase: intent for intent, phrases in INTENT_PHRASES.items() for phrase in phrases}
+
+# Hand-written reply variants served before any reply has been cached
+SEED_REPLIES: Dict[str, Dict[str, List[str]]] = {
+    "feeling_good": {
+        "english": [
+            "That's wonderful to hear! What was the best part of your day so far?",
+            "Great! What's something that made you smile today?",
+            "I'm so glad! Did anything special happen at school today?",
+        ],
+        "hinglish": [
+            "Wah, yeh sunke accha laga! Aaj ka sabse accha part kya tha?",
+            "Badhiya! Aaj kis baat ne aapko khush kiya?",
+            "Bahut accha! Aaj school mein kuch special hua?",
+        ],
+        "hindi": [
+            "यह सुनकर बहुत अच्छा लगा! आज का सबसे अच्छा पल कौन सा था?",
+            "बहुत बढ़िया! आज किस बात ने आपको खुश किया?",
+            "बहुत अच्छा! आज स्कूल में कुछ खास हुआ?",
+        ],
+    },
+    "feeling_okay": {
+        "english": [
+            "Okay, thanks for sharing! What have you been up to today?",
+            "Some days are just okay. What's one thing you did today?",
+        ],
+        "hinglish": [
+            "Theek hai, batane ke liye shukriya! Aaj kya kya kiya?",
+            "Kabhi kabhi din bas theek hi hota hai. Aaj ek cheez batao jo aapne ki?",
+        ],
+        "hindi": [
+            "ठीक है, बताने के लिए धन्यवाद! आज आपने क्या-क्या किया?",
+            "कभी-कभी दिन बस ठीक ही होता है। आज की कोई एक बात बताइए?",
+        ],
+    },
+    "feeling_bad": {
+        "english": [
+            "I'm sorry you're not feeling great. Would you like to tell me what happened?",
+            "That's okay, everyone has days like that. What's on your mind?",
+        ],
+        "hinglish": [
+            "Sunke bura laga. Kya aap batana chahoge kya hua?",
+            "Koi baat nahi, aise din sabke aate hain. Mann mein kya chal raha hai?",
+        ],
+        "hindi": [
+            "यह सुनकर बुरा लगा। क्या आप बताना चाहेंगे कि क्या हुआ?",
+            "कोई बात नहीं, ऐसे दिन सबके आते हैं। आपके मन में क्या चल रहा है?",
+        ],
+    },
+}
+
+
+def normalize_message(text: str) -> str:
+    """Lowercase, strip punctuation and fold spelling variants"""
+    text = _PUNCTUATION_RE.sub(" ", text.lower().replace("'", "").replace("\u2019", ""))
+    words = [_SPELLING.get(word, word) for word in _SPACE_RE.split(text.strip()) if word]
+    return " ".join(" ".join(words).split())
+
+
+class ResponseCache:
+    """Bounded LRU of reply variants keyed on normalized message and language"""
+
+    def __init__(
+        self,
+        hit_ratio: float = DEFAULT_HIT_RATIO,
+        max_words: int = DEFAULT_MAX_WORDS,
+        max_entries: int = 1000,
+        max_variants: int = 5,
+        seed: bool = True,
+    ):
+        self.hit_ratio = hit_ratio
+        self.max_words = max_words
+        self.max_entries = max_entries
+        self.max_variants = max_variants
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if seed:
+            for intent, by_language in SEED_REPLIES.items():
+                for language, replies in by_language.items():
+                    self._entries[self._key(intent, language)] = list(replies)
+
+    @staticmethod
+    def _key(normalized: str, language: str) -> str:
+        return f"{language}:{normalized}"
+
+    def key_for(self, message: str, language: str) -> str:
+        """Cache key: the message's intent if known, else its normalized text"""
+        normalized = normalize_message(message)
+        return self._key(_PHRASE_TO_INTENT.get(normalized, normalized), language)
+
+    def is_cacheable(self, message: str, first_turn: bool = False) -> bool:
+        """Only first-turn answers and trivially short messages are cached"""
+        normalized = normalize_message(message)
+        if not normalized:
+            return False
+        return first_turn or len(normalized.split()) <= self.max_words
+
+    def get(self, message: str, language: str, first_turn: bool = False) -> Optional[str]:
+        """Return a cached reply variant, or None to go to Gemini"""
+        if not self.is_cacheable(message, first_turn):
+            return None
+        key = self.key_for(message, language)
+        with self._lock:
+            variants = self._entries.get(key)
+            # Let a share of requests through anyway so new variants keep arriving
+            if not variants or random.random() >= self.hit_ratio:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return random.choice(variants)
+
+    def put(self, message: str, language: str, reply: str, first_turn: bool = False):
+        """Store a generated reply as another variant for this message"""
+        if not reply or not self.is_cacheable(message, first_turn):
+            return
+        key = self.key_for(message, language)
+        with self._lock:
+            variants = self._entries.setdefault(key, [])
+            if reply not in variants:
+                variants.append(reply)
+                # Keep the newest variants so stale phrasings age out
+                del variants[:-self.max_variants]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
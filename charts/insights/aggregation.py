@@ -0,0 +1,154 @@
+"""
+Single-pass aggregation of the assessment data for admin and teacher insights.
+
+build_cube() groups the students once at the finest grain (center, grade,
+section, gender) and keeps additive statistics there: student counts, score
+sums, per-question sums and histogram bin counts. Any coarser view, such as
+grade x center means or per-center question means, is a cheap roll-up of that
+table. Boxplot statistics (quartiles, whiskers, outliers) are not additive,
+so they are computed vectorized for the few grouping levels the charts use.
+
+Charts read only from the cube, and InsightsCube.to_dict() exposes the same
+numbers as JSON for the dashboards.
+"""
+
+import numpy as np
+import pandas as pd
+
+VALUE = 'Total %'
+QUESTION_COLS = ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6', 'Q7', 'Q8', 'Q9', 'Q10']
+KEYS = ['Center_Name', 'Grade', 'Section', 'Gender (M/F)']
+
+# Fixed bins over the 0-100 score range, so per-group counts add up and a
+# center's histogram does not depend on the other centers' scores
+HIST_EDGES = np.linspace(0, 100, 21)
+
+# Grouping levels that get boxplot statistics
+BOX_LEVELS = [('Center_Name',), ('Center_Name', 'Section'), ('Center_Name', 'Grade')]
+
+# Keyword filters accepted by InsightsCube.where()
+FILTER_COLUMNS = {'center': 'Center_Name', 'grade': 'Grade', 'section': 'Section', 'gender': 'Gender (M/F)'}
+
+_BIN_COLS = [f'bin_{i}' for i in range(len(HIST_EDGES) - 1)]
+
+
+def box_stats(rows, level):
+    """Matplotlib-style boxplot statistics for each group of ``level``"""
+    level = list(level)
+    data = rows[level + [VALUE]].dropna(subset=[VALUE])
+    grouped = data.groupby(level, observed=True)[VALUE]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'med', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    stats['lo'] = stats['q1'] - 1.5 * iqr
+    stats['hi'] = stats['q3'] + 1.5 * iqr
+    stats['n'] = grouped.size()
+
+    # Whiskers reach the most extreme points inside 1.5 IQR; the rest are fliers
+    bounds = data.join(stats[['lo', 'hi']], on=level)
+    inside = bounds[VALUE].between(bounds['lo'], bounds['hi'])
+    within = bounds[inside].groupby(level, observed=True)[VALUE]
+    stats['whislo'] = within.min()
+    stats['whishi'] = within.max()
+    fliers = bounds[~inside].groupby(level, observed=True)[VALUE].agg(list)
+    stats['fliers'] = fliers.reindex(stats.index)
+    stats['fliers'] = stats['fliers'].apply(lambda v: v if isinstance(v, list) else [])
+    return stats.drop(columns=['lo', 'hi'])
+
+
+class InsightsCube:
+    """Pre-aggregated statistics plus the rows they were computed from"""
+
+    def __init__(self, base, boxes, rows):
+        self.base = base        # additive stats indexed by KEYS
+        self.boxes = boxes      # level tuple -> box_stats frame
+        self.rows = rows        # raw rows, for scatter plots and rankings
+
+    def rollup(self, by):
+        """Counts, mean score and mean per-question score grouped by ``by``"""
+        by = [by] if isinstance(by, str) else list(by)
+        sums = self.base.groupby(level=by, observed=True).sum() if by else self.base.sum().to_frame().T
+        out = pd.DataFrame({'n': sums['n']})
+        out['mean_total'] = sums['total_sum'] / sums['total_n']
+        for q in QUESTION_COLS:
+            out[q] = sums[q] / sums['n']
+        return out
+
+    def histogram(self, by=None):
+        """Bin counts over HIST_EDGES, one row per group of ``by``"""
+        if by is None:
+            return self.base[_BIN_COLS].sum().to_frame('all').T
+        return self.base.groupby(level=by, observed=True)[_BIN_COLS].sum()
+
+    def box(self, level):
+        """Boxplot statistics for ``level``, computed on demand if not precomputed"""
+        level = tuple(level)
+        if level not in self.boxes:
+            self.boxes[level] = box_stats(self.rows, level)
+        return self.boxes[level]
+
+    def where(self, **filters):
+        """Return the sub-cube for e.g. ``center='Patna', grade=5``"""
+        filters = {FILTER_COLUMNS[k]: v for k, v in filters.items() if v is not None}
+        if not filters:
+            return self
+
+        mask = np.ones(len(self.base), dtype=bool)
+        for column, value in filters.items():
+            mask &= self.base.index.get_level_values(column) == value
+        base = self.base[mask]
+
+        row_mask = np.ones(len(self.rows), dtype=bool)
+        for column, value in filters.items():
+            row_mask &= (self.rows[column] == value).to_numpy()
+        rows = self.rows[row_mask]
+
+        boxes = {}
+        for level, stats in self.boxes.items():
+            if set(filters) <= set(level):
+                # Filtering a precomputed level is exact: groups are disjoint
+                keep = np.ones(len(stats), dtype=bool)
+                for column, value in filters.items():
+                    keep &= stats.index.get_level_values(column) == value
+                boxes[level] = stats[keep]
+        return InsightsCube(base, boxes, rows)
+
+    def to_dict(self, decimals=None):
+        """JSON-serialisable view of the cube for the dashboards"""
+        def frame(df):
+            if decimals is not None:
+                df = df.round(decimals)
+            return df.reset_index().to_dict(orient='records')
+
+        return {
+            'students': int(self.base['n'].sum()),
+            'hist_edges': HIST_EDGES.tolist(),
+            'by_cell': frame(self.rollup(KEYS)),
+            'by_center': frame(self.rollup(['Center_Name'])),
+            'by_grade_center': frame(self.rollup(['Grade', 'Center_Name'])),
+            'by_section_center': frame(self.rollup(['Section', 'Center_Name'])),
+            'by_gender_center': frame(self.rollup(['Gender (M/F)', 'Center_Name'])),
+            'histogram_by_center': frame(self.histogram(['Center_Name'])),
+            'boxplots': {'/'.join(level): frame(self.box(level)) for level in BOX_LEVELS},
+        }
+
+
+def build_cube(df):
+    """Aggregate ``df`` into an InsightsCube in one grouped pass"""
+    rows = df.reset_index(drop=True)
+    work = rows[KEYS + [VALUE] + QUESTION_COLS].copy()
+
+    # One-hot the histogram bins so bin counts come out of the same groupby
+    values = work[VALUE].to_numpy(dtype=float)
+    bins = np.clip(np.searchsorted(HIST_EDGES, values, side='right') - 1, 0, len(_BIN_COLS) - 1)
+    onehot = np.zeros((len(work), len(_BIN_COLS)), dtype=np.int64)
+    scored = ~np.isnan(values)
+    onehot[np.flatnonzero(scored), bins[scored]] = 1
+    work[_BIN_COLS] = onehot
+    work['n'] = 1
+    work['total_n'] = scored.astype(np.int64)
+    work['total_sum'] = np.where(scored, values, 0.0)
+
+    base = work.drop(columns=[VALUE]).groupby(KEYS, observed=True, dropna=False).sum()
+    boxes = {level: box_stats(rows, level) for level in BOX_LEVELS}
+    return InsightsCube(base, boxes, rows)
@@ -0,0 +1,148 @@
+"""
+Dependency tracking for the files insights.py writes to output/.
+
+Every output gets a build key: a hash of the rows and columns it is drawn
+from, its title label, the render function's name and the chart code
+version (code_version()). Rendered
+files are kept in a content-addressed store (output/.store/<key>.<ext>) and
+copied to their public path, so a chart is only rendered again when its own
+inputs or code change. output/manifest.json records the key of every output
+and what the last run rebuilt, restored or skipped. When it is saved, entries
+for outputs the run no longer produces (e.g. a center that left the data) are
+dropped, and so are stored files no entry refers to any more.
+"""
+
+import datetime
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+MANIFEST_NAME = 'manifest.json'
+STORE_DIR_NAME = '.store'
+
+# Bump to rebuild every chart when something outside the hashed modules
+# changes their look (e.g. a matplotlib or seaborn upgrade)
+CHART_CODE_VERSION = 1
+# Modules every chart is drawn through, besides the render function's own
+CHART_CODE_MODULES = ('aggregation', 'ranking')
+
+
+@functools.lru_cache(maxsize=None)
+def _module_hash(name):
+    module = sys.modules.get(name) or importlib.import_module(name)
+    return hashlib.sha256(inspect.getsource(module).encode('utf-8')).hexdigest()
+
+
+def code_version(func):
+    """Hash of all the code a render function's output depends on
+
+    The whole defining module is hashed, not just ``func``, so edits to the
+    helpers it calls (_draw_boxes, _title, ...) count too, as do edits to
+    aggregation.py (HIST_EDGES, the cube) and ranking.py.
+    """
+    digest = hashlib.sha256(str(CHART_CODE_VERSION).encode('utf-8'))
+    for name in dict.fromkeys((func.__module__,) + CHART_CODE_MODULES):
+        digest.update(_module_hash(name).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def frame_hash(df, columns=None):
+    """Order-sensitive hash of the selected columns of a data frame"""
+    subset = df if columns is None else df[list(columns)]
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(map(str, subset.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(subset, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """Manifest plus content-addressed store for one output directory"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.store_dir = os.path.join(output_dir, STORE_DIR_NAME)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.entries = json.load(f).get('outputs', {})
+        self.rebuilt, self.restored, self.skipped = [], [], []
+        # Outputs this run checked or published; the others are dropped on save
+        self.seen = set()
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.output_dir).replace(os.sep, '/')
+
+    @staticmethod
+    def key(func, df, columns=None, label=None):
+        """Build key for rendering ``func`` over ``df[columns]`` with ``label``"""
+        digest = hashlib.sha256()
+        for part in (func.__qualname__, code_version(func), frame_hash(df, columns), str(label)):
+            digest.update(part.encode('utf-8'))
+        return digest.hexdigest()
+
+    def store_path(self, key, path):
+        return os.path.join(self.store_dir, key + os.path.splitext(path)[1])
+
+    def is_fresh(self, path, key):
+        entry = self.entries.get(self._rel(path))
+        return entry is not None and entry['key'] == key and os.path.exists(path)
+
+    def check(self, path, key):
+        """Return True if ``path`` needs rendering; restore it from the store if possible"""
+        self.seen.add(self._rel(path))
+        if self.is_fresh(path, key):
+            self.skipped.append(self._rel(path))
+            return False
+        if os.path.exists(self.store_path(key, path)):
+            self.publish(path, key, restored=True)
+            return False
+        return True
+
+    def publish(self, path, key, restored=False):
+        """Copy a stored artifact to its public path and record it"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        shutil.copyfile(self.store_path(key, path), path)
+        rel = self._rel(path)
+        self.seen.add(rel)
+        self.entries[rel] = {'key': key, 'built_at': datetime.datetime.now().isoformat(timespec='seconds')}
+        (self.restored if restored else self.rebuilt).append(rel)
+
+    def save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        dropped = self.prune()
+        manifest = {
+            'outputs': self.entries,
+            'last_run': {
+                'finished_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                'rebuilt': self.rebuilt,
+                'restored': self.restored,
+                'skipped': self.skipped,
+                'dropped': dropped,
+            },
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    def prune(self):
+        """Drop entries for outputs this run did not produce, then stored files no entry uses.
+
+        Returns the dropped outputs.
+        """
+        dropped = sorted(rel for rel in self.entries if rel not in self.seen)
+        for rel in dropped:
+            del self.entries[rel]
+        if not os.path.isdir(self.store_dir):
+            return dropped
+        keys = {entry['key'] for entry in self.entries.values()}
+        for name in os.listdir(self.store_dir):
+            if os.path.splitext(name)[0] not in keys:
+                os.remove(os.path.join(self.store_dir, name))
+        return dropped
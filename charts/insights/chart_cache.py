@@ -0,0 +1,114 @@
+"""
+Two-level LRU cache for charts rendered on demand by insights_api.py.
+
+Rendered images are kept in a bounded in-memory LRU and in a bounded
+directory on disk, both keyed by a hash of the chart parameters, the data
+version and the chart's code. Memory hits are free; disk hits survive
+restarts and are promoted back into memory. The least recently used files
+are evicted once the directory grows past its byte budget.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def chart_key(*parts):
+    """Cache key for one rendered chart"""
+    return hashlib.sha256('\x1f'.join(map(str, parts)).encode('utf-8')).hexdigest()
+
+
+class ChartCache:
+    """Bounded memory + disk LRU of rendered chart bytes"""
+
+    def __init__(self, directory, memory_bytes=32 << 20, disk_bytes=256 << 20, suffix='.png'):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.suffix = suffix
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._disk_size = sum(entry.stat().st_size for entry in os.scandir(directory)
+                              if entry.name.endswith(suffix))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _remember(self, key, data):
+        """Add to the memory LRU, evicting the oldest entries past the budget"""
+        if len(data) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+
+    def get(self, key, count=True):
+        """Return the cached bytes for ``key``, or None; ``count`` records hit/miss stats"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits['memory'] += count
+                return self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # mtime doubles as the disk LRU clock
+            except FileNotFoundError:
+                self.misses += count
+                return None
+            self.hits['disk'] += count
+            self._remember(key, data)
+            return data
+
+    def put(self, key, data):
+        """Store rendered bytes in memory and on disk"""
+        with self._lock:
+            self._remember(key, data)
+
+            path = self._path(key)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            # Write to a temp file first so readers never see a partial image
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._disk_size += len(data) - previous
+            self._evict_disk()
+
+    def _evict_disk(self):
+        if self._disk_size <= self.disk_bytes:
+            return
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith(self.suffix)),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._disk_size <= self.disk_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._disk_size -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_size,
+                'disk_bytes': self._disk_size,
+                'hits': dict(self.hits),
+                'misses': self.misses,
+            }
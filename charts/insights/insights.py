@@ -1,150 +1,340 @@
+import argparse
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')  # headless backend, safe to use from worker processes
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
 
-# Load the data
-df = pd.read_excel('complete_data_with_assessments.xlsx')
+from aggregation import HIST_EDGES, build_cube
+from build_cache import BuildCache
+from ranking import top_bottom
+
+# Shared workbook loading lives in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from student_data import CENTERS, load_assessments
+
+DATA_FILE = 'complete_data_with_assessments.xlsx'
+OUTPUT_DIR = 'output'
+
+question_cols = ['Q1','Q2','Q3','Q4','Q5','Q6','Q7','Q8','Q9','Q10']
+
+
+def load_data(path=DATA_FILE):
+    """Load the assessments workbook (cached) with the Center columns"""
+    return load_assessments(path)
 
-# Create a 'Center' column based on Roll No prefix
-df['Center'] = df['Roll No'].str.extract(r'^([A-Z]+)')[0]
-df['Center_Name'] = df['Center'].map({'BIH': 'Bihar', 'PAT': 'Patna', 'SMT': 'SMT'})
 
-# Save to CSV
-if not os.path.exists('output'):
-    os.makedirs('output')
-df.to_csv('output/complete_student_data.csv', index=False)
+def _title(prefix, text):
+    return f'{prefix} - {text}' if prefix else text
+
+
+def _draw_boxes(ax, stats, x, hue=None):
+    """Draw precomputed box statistics, grouped by ``x`` and optionally ``hue``"""
+    stats = stats.reset_index()
+    xs = list(dict.fromkeys(sorted(stats[x])))
+    hues = list(dict.fromkeys(sorted(stats[hue]))) if hue else [None]
+    colors = sns.color_palette(n_colors=len(xs) if hue is None else len(hues))
+    width = 0.8 / len(hues)
+    for j, h in enumerate(hues):
+        group = stats if h is None else stats[stats[hue] == h]
+        for _, row in group.iterrows():
+            i = xs.index(row[x])
+            position = i - 0.4 + width * (j + 0.5)
+            artists = ax.bxp([{
+                'med': row['med'], 'q1': row['q1'], 'q3': row['q3'],
+                'whislo': row['whislo'], 'whishi': row['whishi'], 'fliers': row['fliers'],
+            }], positions=[position], widths=width * 0.9, patch_artist=True,
+                manage_ticks=False, medianprops={'color': 'black'})
+            artists['boxes'][0].set_facecolor(colors[j if hue else i])
+    if hue:
+        ax.legend(handles=[plt.Rectangle((0, 0), 1, 1, color=c) for c in colors], labels=hues, title=hue)
+    ax.set_xticks(range(len(xs)))
+    ax.set_xticklabels(xs)
+    ax.set_xlim(-0.5, len(xs) - 0.5)
+    ax.set_xlabel(x)
+    ax.set_ylabel('Total %')
+
+
+def _draw_histograms(ax, counts, title):
+    for label, row in counts.iterrows():
+        ax.stairs(row.to_numpy(), HIST_EDGES, label=str(label))
+    ax.legend(title=title)
+    ax.set_xlabel('Total %')
+    ax.set_ylabel('Count')
 
-# Set style for plots
-sns.set_theme(style="whitegrid")
-plt.figure(figsize=(10, 6))
 
 # =============================================
 # ADMIN VISUALIZATIONS (Comparing Centers)
 # =============================================
 
-print("\nGenerating Admin Visualizations...")
-
-# 1. Overall Performance by Center
-plt.figure(figsize=(12, 6))
-sns.boxplot(x='Center_Name', y='Total %', data=df)
-plt.title('Overall Performance Distribution by Center')
-plt.savefig('output/admin_1_overall_performance_by_center.png')
-plt.close()
-
-# 2. Average Score by Grade Across Centers
-plt.figure(figsize=(14, 7))
-grade_center_avg = df.groupby(['Grade', 'Center_Name'])['Total %'].mean().unstack()
-grade_center_avg.plot(kind='bar')
-plt.title('Average Performance by Grade Across Centers')
-plt.ylabel('Average Percentage')
-plt.xticks(rotation=0)
-plt.tight_layout()
-plt.savefig('output/admin_2_avg_score_by_grade_center.png')
-plt.close()
-
-# 3. Gender Performance Comparison Across Centers
-plt.figure(figsize=(12, 6))
-sns.barplot(x='Center_Name', y='Total %', hue='Gender (M/F)', data=df, ci=None)
-plt.title('Gender Performance Comparison Across Centers')
-plt.savefig('output/admin_3_gender_comparison.png')
-plt.close()
-
-# 4. Question-wise Performance by Center
-question_cols = ['Q1','Q2','Q3','Q4','Q5','Q6','Q7','Q8','Q9','Q10']
-question_means = df.groupby('Center_Name')[question_cols].mean().T
-plt.figure(figsize=(14, 7))
-question_means.plot(kind='bar')
-plt.title('Average Question Performance by Center')
-plt.ylabel('Average Score (out of 3)')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig('output/admin_4_question_performance.png')
-plt.close()
-
-# 5. Score Distribution by Center
-plt.figure(figsize=(12, 6))
-sns.histplot(data=df, x='Total %', hue='Center_Name', element='step', bins=15)
-plt.title('Score Distribution by Center')
-plt.savefig('output/admin_5_score_distribution.png')
-plt.close()
-
-# 6. Section Performance Across Centers
-plt.figure(figsize=(12, 6))
-sns.boxplot(x='Section', y='Total %', hue='Center_Name', data=df)
-plt.title('Section Performance Comparison Across Centers')
-plt.savefig('output/admin_6_section_performance.png')
-plt.close()
-
-# 7. Top/Bottom Performers by Center
-top_bottom = df.groupby('Center_Name').apply(
-    lambda x: pd.concat([x.nlargest(5, 'Total %'), x.nsmallest(5, 'Total %')])
-).reset_index(drop=True)
-top_bottom.to_csv('output/admin_top_bottom_performers.csv', index=False)
+def admin_overall_performance(cube, prefix=None):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _draw_boxes(ax, cube.box(['Center_Name']), 'Center_Name')
+    ax.set_title(_title(prefix, 'Overall Performance Distribution by Center'))
+    return fig
+
+
+def admin_avg_score_by_grade_center(cube, prefix=None):
+    fig, ax = plt.subplots(figsize=(14, 7))
+    grade_center_avg = cube.rollup(['Grade', 'Center_Name'])['mean_total'].unstack()
+    grade_center_avg.plot(kind='bar', ax=ax)
+    ax.set_title(_title(prefix, 'Average Performance by Grade Across Centers'))
+    ax.set_ylabel('Average Percentage')
+    ax.tick_params(axis='x', labelrotation=0)
+    fig.tight_layout()
+    return fig
+
+
+def admin_gender_comparison(cube, prefix=None):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    gender_avg = cube.rollup(['Center_Name', 'Gender (M/F)'])['mean_total'].unstack()
+    gender_avg.plot(kind='bar', ax=ax)
+    ax.set_title(_title(prefix, 'Gender Performance Comparison Across Centers'))
+    ax.set_ylabel('Total %')
+    ax.tick_params(axis='x', labelrotation=0)
+    return fig
+
+
+def admin_question_performance(cube, prefix=None):
+    fig, ax = plt.subplots(figsize=(14, 7))
+    question_means = cube.rollup(['Center_Name'])[question_cols].T
+    question_means.plot(kind='bar', ax=ax)
+    ax.set_title(_title(prefix, 'Average Question Performance by Center'))
+    ax.set_ylabel('Average Score (out of 3)')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def admin_score_distribution(cube, prefix=None):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _draw_histograms(ax, cube.histogram(['Center_Name']), 'Center_Name')
+    ax.set_title(_title(prefix, 'Score Distribution by Center'))
+    return fig
+
+
+def admin_section_performance(cube, prefix=None):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _draw_boxes(ax, cube.box(['Center_Name', 'Section']), 'Section', hue='Center_Name')
+    ax.set_title(_title(prefix, 'Section Performance Comparison Across Centers'))
+    return fig
+
+
+def admin_top_bottom(cube, prefix=None):
+    return top_bottom(cube.rows, 'Center_Name', 'Total %', k=5)
+
 
 # =============================================
 # TEACHER VISUALIZATIONS (Within Each Center)
 # =============================================
 
-print("\nGenerating Teacher Visualizations for Each Center...")
-
-for center in ['BIH', 'PAT', 'SMT']:
-    center_df = df[df['Center'] == center]
-    center_name = center_df['Center_Name'].iloc[0]
-    
-    if not os.path.exists(f'output/{center_name}'):
-        os.makedirs(f'output/{center_name}')
-    
-    # 1. Performance Distribution by Grade
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(x='Grade', y='Total %', data=center_df)
-    plt.title(f'{center_name} - Performance Distribution by Grade')
-    plt.savefig(f'output/{center_name}/teacher_1_grade_performance.png')
-    plt.close()
-    
-    # 2. Section-wise Performance
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(x='Section', y='Total %', data=center_df)
-    plt.title(f'{center_name} - Section-wise Performance')
-    plt.savefig(f'output/{center_name}/teacher_2_section_performance.png')
-    plt.close()
-    
-    # 3. Gender Performance Comparison
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='Grade', y='Total %', hue='Gender (M/F)', data=center_df, ci=None)
-    plt.title(f'{center_name} - Gender Performance by Grade')
-    plt.savefig(f'output/{center_name}/teacher_3_gender_performance.png')
-    plt.close()
-    
-    # 4. Question-wise Performance
-    plt.figure(figsize=(14, 7))
-    question_means = center_df[question_cols].mean().sort_values()
-    question_means.plot(kind='bar')
-    plt.title(f'{center_name} - Average Question Performance')
-    plt.ylabel('Average Score (out of 3)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(f'output/{center_name}/teacher_4_question_performance.png')
-    plt.close()
-    
-    # 5. Score Distribution by Section
-    plt.figure(figsize=(12, 6))
-    sns.histplot(data=center_df, x='Total %', hue='Section', element='step', bins=15)
-    plt.title(f'{center_name} - Score Distribution by Section')
-    plt.savefig(f'output/{center_name}/teacher_5_section_distribution.png')
-    plt.close()
-    
-    # 6. Top/Bottom Performers by Section
-    top_bottom_center = center_df.groupby('Section').apply(
-        lambda x: pd.concat([x.nlargest(3, 'Total %'), x.nsmallest(3, 'Total %')])
-    ).reset_index(drop=True)
-    top_bottom_center.to_csv(f'output/{center_name}/teacher_top_bottom_performers.csv', index=False)
-    
-    # 7. Age vs Performance
-    plt.figure(figsize=(12, 6))
-    sns.scatterplot(x='DOB /Age', y='Total %', hue='Section', data=center_df)
-    plt.title(f'{center_name} - Age vs Performance')
-    plt.savefig(f'output/{center_name}/teacher_6_age_vs_performance.png')
-    plt.close()
-
-print("\nVisualizations generated successfully in the 'output' folder!")
\ No newline at end of file
+def teacher_grade_performance(cube, center_name):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _draw_boxes(ax, cube.box(['Center_Name', 'Grade']), 'Grade')
+    ax.set_title(_title(center_name, 'Performance Distribution by Grade'))
+    return fig
+
+
+def teacher_section_performance(cube, center_name):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _draw_boxes(ax, cube.box(['Center_Name', 'Section']), 'Section')
+    ax.set_title(_title(center_name, 'Section-wise Performance'))
+    return fig
+
+
+def teacher_gender_performance(cube, center_name):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    gender_avg = cube.rollup(['Grade', 'Gender (M/F)'])['mean_total'].unstack()
+    gender_avg.plot(kind='bar', ax=ax)
+    ax.set_title(_title(center_name, 'Gender Performance by Grade'))
+    ax.set_ylabel('Total %')
+    ax.tick_params(axis='x', labelrotation=0)
+    return fig
+
+
+def teacher_question_performance(cube, center_name):
+    fig, ax = plt.subplots(figsize=(14, 7))
+    question_means = cube.rollup([]).iloc[0][question_cols].astype(float).sort_values()
+    question_means.plot(kind='bar', ax=ax)
+    ax.set_title(_title(center_name, 'Average Question Performance'))
+    ax.set_ylabel('Average Score (out of 3)')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def teacher_section_distribution(cube, center_name):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _draw_histograms(ax, cube.histogram(['Section']), 'Section')
+    ax.set_title(_title(center_name, 'Score Distribution by Section'))
+    return fig
+
+
+def teacher_age_vs_performance(cube, center_name):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.scatterplot(x='DOB /Age', y='Total %', hue='Section', data=cube.rows, ax=ax)
+    ax.set_title(_title(center_name, 'Age vs Performance'))
+    return fig
+
+
+def teacher_top_bottom(cube, center_name):
+    return top_bottom(cube.rows, 'Section', 'Total %', k=3)
+
+
+# Output file name -> render function. PNGs are figures, CSVs are tables.
+ADMIN_CHARTS = {
+    'admin_1_overall_performance_by_center.png': admin_overall_performance,
+    'admin_2_avg_score_by_grade_center.png': admin_avg_score_by_grade_center,
+    'admin_3_gender_comparison.png': admin_gender_comparison,
+    'admin_4_question_performance.png': admin_question_performance,
+    'admin_5_score_distribution.png': admin_score_distribution,
+    'admin_6_section_performance.png': admin_section_performance,
+    'admin_top_bottom_performers.csv': admin_top_bottom,
+}
+
+TEACHER_CHARTS = {
+    'teacher_1_grade_performance.png': teacher_grade_performance,
+    'teacher_2_section_performance.png': teacher_section_performance,
+    'teacher_3_gender_performance.png': teacher_gender_performance,
+    'teacher_4_question_performance.png': teacher_question_performance,
+    'teacher_5_section_distribution.png': teacher_section_distribution,
+    'teacher_top_bottom_performers.csv': teacher_top_bottom,
+    'teacher_6_age_vs_performance.png': teacher_age_vs_performance,
+}
+
+# Columns each output is drawn from (None = every column). Only changes to
+# these columns in the chart's rows trigger a rebuild.
+CHART_COLUMNS = {
+    'admin_1_overall_performance_by_center.png': ['Center_Name', 'Total %'],
+    'admin_2_avg_score_by_grade_center.png': ['Grade', 'Center_Name', 'Total %'],
+    'admin_3_gender_comparison.png': ['Center_Name', 'Gender (M/F)', 'Total %'],
+    'admin_4_question_performance.png': ['Center_Name'] + question_cols,
+    'admin_5_score_distribution.png': ['Center_Name', 'Total %'],
+    'admin_6_section_performance.png': ['Section', 'Center_Name', 'Total %'],
+    'admin_top_bottom_performers.csv': None,
+    'teacher_1_grade_performance.png': ['Grade', 'Total %'],
+    'teacher_2_section_performance.png': ['Section', 'Total %'],
+    'teacher_3_gender_performance.png': ['Grade', 'Gender (M/F)', 'Total %'],
+    'teacher_4_question_performance.png': question_cols,
+    'teacher_5_section_distribution.png': ['Section', 'Total %'],
+    'teacher_top_bottom_performers.csv': None,
+    'teacher_6_age_vs_performance.png': ['DOB /Age', 'Section', 'Total %'],
+}
+
+# One independent unit of work: an output file for the admin view (center=None)
+# or for one center's teacher view
+RenderTask = namedtuple('RenderTask', ['filename', 'center'])
+
+
+def build_tasks(centers):
+    """List every admin chart plus every teacher chart for each center"""
+    tasks = [RenderTask(name, None) for name in ADMIN_CHARTS]
+    for center in centers:
+        tasks.extend(RenderTask(name, center) for name in TEACHER_CHARTS)
+    return tasks
+
+
+def output_path(task, output_dir=OUTPUT_DIR):
+    if task.center is None:
+        return os.path.join(output_dir, task.filename)
+    return os.path.join(output_dir, CENTERS[task.center], task.filename)
+
+
+def resolve(task, cube):
+    """Return the sub-cube, title label and render function for a task"""
+    if task.center is None:
+        return cube, None, ADMIN_CHARTS[task.filename]
+    view = cube.where(center=CENTERS[task.center])
+    return view, CENTERS[task.center], TEACHER_CHARTS[task.filename]
+
+
+def render(task, cube, path):
+    """Render one task from the aggregated data and write it to ``path``"""
+    view, label, func = resolve(task, cube)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    result = func(view, label)
+    if isinstance(result, pd.DataFrame):
+        result.to_csv(path, index=False)
+    else:
+        result.savefig(path)
+        plt.close(result)
+    return path
+
+
+# Each worker process aggregates the dataset once and reuses it for all its tasks
+_worker_cube = None
+
+
+def _init_worker(data_file):
+    global _worker_cube
+    _worker_cube = build_cube(load_data(data_file))
+    sns.set_theme(style="whitegrid")
+
+
+def _run_task(job):
+    task, path = job
+    return render(task, _worker_cube, path)
+
+
+def main(data_file=DATA_FILE, workers=None, force=False):
+    df = load_data(data_file)
+
+    # Save to CSV
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    df.to_csv(os.path.join(OUTPUT_DIR, 'complete_student_data.csv'), index=False)
+
+    centers = [c for c in CENTERS if (df['Center'] == c).any()]
+    tasks = build_tasks(centers)
+    cube = build_cube(df)
+
+    # Only render outputs whose input rows, columns or chart code changed
+    cache = BuildCache(OUTPUT_DIR)
+    stale = []
+    for task in tasks:
+        path = output_path(task)
+        view, label, func = resolve(task, cube)
+        key = cache.key(func, view.rows, CHART_COLUMNS[task.filename], label)
+        if force or cache.check(path, key):
+            stale.append((task, path, key))
+
+    print(f"\nGenerating {len(stale)} of {len(tasks)} Admin and Teacher Visualizations...")
+    failed = []
+    try:
+        if stale:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(data_file,)) as pool:
+                futures = {pool.submit(_run_task, (task, cache.store_path(key, path))): (path, key)
+                           for task, path, key in stale}
+                for future in as_completed(futures):
+                    path, key = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed.append(path)
+                        print(f"  ❌ {path}: {e}")
+                        continue
+                    cache.publish(path, key)
+                    print(f"  {path}")
+    finally:
+        # Record what was published even if a task or the pool failed
+        cache.save()
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(stale)} outputs failed to render")
+
+    print(f"\nRebuilt {len(cache.rebuilt)}, restored {len(cache.restored)}, "
+          f"up to date {len(cache.skipped)} (see {cache.manifest_path})")
+    print(f"\nVisualizations generated successfully in the '{OUTPUT_DIR}' folder!")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate admin and teacher insight charts')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--force', action='store_true', help='rebuild every output')
+    args = parser.parse_args()
+    main(workers=args.workers, force=args.force)
@@ -0,0 +1,292 @@
+"""
+JSON insights API for the admin and teacher dashboards.
+
+Serves the pre-aggregated statistics from aggregation.py (boxplot quantiles,
+grade x center means, question means, histograms) as compact JSON so the
+frontend can draw charts client-side and filter by any center, grade, section
+or gender without regenerating PNGs.
+
+Responses carry a strong ETag; clients that send it back in If-None-Match get
+a 304 with no body. Larger bodies are gzip-compressed.
+
+/charts/<chart>.png renders any insights.py chart for a center, grade and
+section on request, through a memory + disk LRU (chart_cache.py) keyed by the
+parameters, the data version and the chart code version (build_cache.code_version()).
+
+Run with: uvicorn insights_api:app --host 127.0.0.1 --port 8002
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+
+from aggregation import build_cube
+from build_cache import code_version
+from chart_cache import ChartCache, chart_key
+from insights import ADMIN_CHARTS, TEACHER_CHARTS, plt, sns
+
+# Shared workbook loading lives in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from student_data import CENTERS, file_sha256, load_assessments
+
+DATA_FILE = os.getenv(
+    'INSIGHTS_DATA_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'complete_data_with_assessments.xlsx'),
+)
+MAX_CACHED_PAYLOADS = 512
+CHART_CACHE_DIR = os.getenv(
+    'INSIGHTS_CHART_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'charts'),
+)
+CHART_MEMORY_MB = int(os.getenv('INSIGHTS_CHART_MEMORY_MB', '32'))
+CHART_DISK_MB = int(os.getenv('INSIGHTS_CHART_DISK_MB', '256'))
+
+# Chart type -> render function, e.g. admin_overall_performance_by_center
+CHART_TYPES = {
+    re.sub(r'_\d+_', '_', os.path.splitext(name)[0]): func
+    for name, func in {**ADMIN_CHARTS, **TEACHER_CHARTS}.items() if name.endswith('.png')
+}
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class DataSource:
+    """Keeps the cube for a workbook, rebuilding it when the workbook changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._stat = None
+        self.version = None
+        self.cube = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Return (version, cube), reloading if the workbook's mtime or size changed"""
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            if signature != self._stat:
+                df = load_assessments(self.path)
+                self.cube = build_cube(df)
+                self.version = file_sha256(self.path)[:16]
+                self._stat = signature
+                logger.info(f"Loaded {len(df)} students from {self.path} (version {self.version})")
+            return self.version, self.cube
+
+
+source = DataSource(DATA_FILE)
+
+# (version, filters) -> (body, etag); entries for old versions simply age out
+_payloads = OrderedDict()
+_payloads_lock = threading.Lock()
+
+
+def make_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match lists ``etag`` (weak or strong) or *"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+def json_response(request, body, etag):
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def center_name(center):
+    """Accept a center code (PAT) or name (Patna)"""
+    if center is None:
+        return None
+    if center.upper() in CENTERS:
+        return CENTERS[center.upper()]
+    for name in CENTERS.values():
+        if name.lower() == center.lower():
+            return name
+    raise HTTPException(status_code=404, detail=f"Unknown center '{center}'")
+
+
+def insights_payload(center=None, grade=None, section=None, gender=None):
+    """Encoded JSON and ETag for one filter combination"""
+    version, cube = source.current()
+    filters = {
+        'center': center_name(center),
+        'grade': grade,
+        'section': section.upper() if section else None,
+        'gender': gender.upper() if gender else None,
+    }
+    key = (version,) + tuple(filters.items())
+
+    with _payloads_lock:
+        if key in _payloads:
+            _payloads.move_to_end(key)
+            return _payloads[key]
+
+    view = cube.where(**filters)
+    if view.rows.empty:
+        raise HTTPException(status_code=404, detail="No students match these filters")
+    payload = {
+        'version': version,
+        'filters': filters,
+        **view.to_dict(decimals=2),
+    }
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    entry = (body, make_etag(body))
+
+    with _payloads_lock:
+        _payloads[key] = entry
+        while len(_payloads) > MAX_CACHED_PAYLOADS:
+            _payloads.popitem(last=False)
+    return entry
+
+
+chart_cache = ChartCache(CHART_CACHE_DIR, CHART_MEMORY_MB << 20, CHART_DISK_MB << 20)
+# pyplot keeps global state, so renders in this process run one at a time
+_render_lock = threading.Lock()
+sns.set_theme(style="whitegrid")
+
+
+def render_chart(chart, center=None, grade=None, section=None):
+    """PNG bytes and ETag for one chart and filter combination, via the LRU"""
+    func = CHART_TYPES.get(chart)
+    if func is None:
+        raise HTTPException(status_code=404, detail=f"Unknown chart '{chart}'")
+    name = center_name(center)
+    section = section.upper() if section else None
+    if chart.startswith('teacher_') and name is None:
+        raise HTTPException(status_code=400, detail="Teacher charts need a center")
+
+    version, cube = source.current()
+    key = chart_key(chart, name, grade, section, version, code_version(func))
+    etag = '"' + key[:32] + '"'
+    data = chart_cache.get(key)
+    if data is not None:
+        return data, etag
+
+    with _render_lock:
+        # Another request may have rendered it while we waited
+        data = chart_cache.get(key, count=False)
+        if data is not None:
+            return data, etag
+        view = cube.where(center=name, grade=grade, section=section)
+        if view.rows.empty:
+            raise HTTPException(status_code=404, detail="No students match these filters")
+        label = ', '.join(part for part in (name, grade and f'Grade {grade}',
+                                            section and f'Section {section}') if part) or None
+        fig = func(view, label)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        plt.close(fig)
+        data = buffer.getvalue()
+        chart_cache.put(key, data)
+    return data, etag
+
+
+app = FastAPI(
+    title="Insights API",
+    description="Aggregated assessment statistics for the admin and teacher dashboards",
+    version="1.0.0"
+)
+
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[
+        "http://localhost:5173",
+        "http://localhost:5174",
+        "http://127.0.0.1:5173",
+        "http://127.0.0.1:5174",
+        "http://localhost:3000"
+    ],
+    allow_methods=["GET", "OPTIONS"],
+    allow_headers=["*"],
+    expose_headers=["ETag"],
+)
+
+
+# Endpoints that call source.current() are plain functions: a workbook change
+# re-reads and aggregates it, which must run in the threadpool, not the event loop
+@app.get("/insights")
+def get_insights(request: Request, center: str = None, grade: int = None,
+                       section: str = None, gender: str = None):
+    """Aggregated statistics, optionally filtered by center, grade, section and gender"""
+    body, etag = insights_payload(center=center, grade=grade, section=section, gender=gender)
+    return json_response(request, body, etag)
+
+
+@app.get("/insights/filters")
+def get_filters(request: Request):
+    """Values available for each filter"""
+    version, cube = source.current()
+    rows = cube.rows
+    payload = {
+        'version': version,
+        'centers': {code: name for code, name in CENTERS.items() if (rows['Center'] == code).any()},
+        'grades': sorted(int(g) for g in rows['Grade'].dropna().unique()),
+        'sections': sorted(rows['Section'].dropna().unique().tolist()),
+        'genders': sorted(rows['Gender (M/F)'].dropna().unique().tolist()),
+    }
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return json_response(request, body, make_etag(body))
+
+
+@app.get("/charts")
+async def list_charts():
+    """Chart types available from /charts/<chart>.png"""
+    return {"charts": sorted(CHART_TYPES), "cache": chart_cache.stats()}
+
+
+@app.get("/charts/{chart}.png")
+def get_chart(request: Request, chart: str, center: str = None, grade: int = None, section: str = None):
+    """Render one chart on request, e.g. /charts/teacher_grade_performance.png?center=PAT"""
+    data, etag = render_chart(chart, center, grade, section)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type='image/png', headers=headers)
+
+
+@app.get("/health")
+def health_check():
+    """Health check endpoint to verify the data loads"""
+    try:
+        version, cube = source.current()
+        return {"status": "healthy", "version": version, "students": len(cube.rows)}
+    except Exception as e:
+        logger.error(f"Health check failed: {str(e)}")
+        return {"status": "unhealthy", "error": str(e)}
+
+
+@app.get("/")
+async def root():
+    """Root endpoint with API information"""
+    return {
+        "message": "Insights API is running",
+        "version": "1.0.0",
+        "endpoints": {
+            "insights": "/insights?center=&grade=&section=&gender=",
+            "filters": "/insights/filters",
+            "charts": "/charts",
+            "chart": "/charts/<chart>.png?center=&grade=&section=",
+            "health": "/health"
+        }
+    }
@@ -0,0 +1,77 @@
+"""
+Vectorized within-group rankings for the top/bottom performer tables.
+
+groupby(...).apply(lambda x: pd.concat([x.nlargest(k), x.nsmallest(k)])) calls
+Python once per group and concatenates one frame per group, which gets slow
+with hundreds of sections. top_bottom() ranks every row within its group with
+a single groupby rank in each direction, then takes the rows by boolean mask,
+so the cost no longer depends on the number of groups.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ties='first' keeps exactly k rows per group (like nlargest(keep='first'));
+# ties='all' also keeps rows tied with the k-th value (like keep='all')
+_TIE_METHODS = {'first': 'first', 'all': 'min'}
+
+
+def group_rank(df, by, value, ascending=False, ties='first'):
+    """1-based rank of each row's ``value`` within its ``by`` group"""
+    return df.groupby(by, observed=True, sort=False)[value].rank(
+        method=_TIE_METHODS[ties], ascending=ascending)
+
+
+def group_percentile(df, by, value):
+    """Percentile (0-100] of each row's ``value`` within its ``by`` group"""
+    return df.groupby(by, observed=True, sort=False)[value].rank(method='max', pct=True) * 100
+
+
+def top_bottom(df, by, value, k=None, fraction=None, ties='first', with_rank=False):
+    """Top and bottom performers of every group, in one vectorized pass.
+
+    Args:
+        df (pd.DataFrame): Rows to rank
+        by (str or list): Grouping column(s)
+        value (str): Column to rank on; NaN values are never selected
+        k (int): Rows to take from each end of every group
+        fraction (float): Alternatively, take this share of each group (e.g. 0.1)
+        ties (str): 'first' for exactly k rows, 'all' to keep ties at the cut
+        with_rank (bool): Add 'Rank', 'Percentile' and 'Position' columns
+
+    Returns:
+        pd.DataFrame: For each group in sorted order, its top rows (highest
+        first) followed by its bottom rows (lowest first). A row can appear in
+        both lists when a group has fewer than 2k rows, as with nlargest/nsmallest.
+    """
+    if (k is None) == (fraction is None):
+        raise ValueError("Pass exactly one of k or fraction")
+    by = [by] if isinstance(by, str) else list(by)
+    df = df.reset_index(drop=True)
+
+    top_rank = group_rank(df, by, value, ascending=False, ties=ties)
+    bottom_rank = group_rank(df, by, value, ascending=True, ties=ties)
+    if fraction is not None:
+        sizes = df.groupby(by, observed=True, sort=False)[value].transform('count')
+        limit = np.maximum(np.ceil(sizes * fraction), 1)
+    else:
+        limit = k
+
+    parts = []
+    for position, rank in (('top', top_rank), ('bottom', bottom_rank)):
+        selected = rank <= limit
+        part = df[selected].copy()
+        part['_rank'] = rank[selected]
+        part['_part'] = 0 if position == 'top' else 1
+        part['Position'] = position
+        parts.append(part)
+    result = pd.concat(parts)
+    result['_row'] = result.index
+
+    result = result.sort_values(by + ['_part', '_rank', '_row'], kind='stable')
+    if with_rank:
+        result['Rank'] = result.pop('_rank').astype(int)
+        result['Percentile'] = group_percentile(df, by, value).loc[result['_row']].to_numpy()
+    else:
+        result = result.drop(columns=['_rank', 'Position'])
+    return result.drop(columns=['_part', '_row']).reset_index(drop=True)
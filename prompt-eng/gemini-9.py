@@ -3,9 +3,13 @@ import json
 import datetime
 from fpdf import FPDF
 import os
-import re
+import sys
 from typing import List, Dict
 from dotenv import load_dotenv
+
+# Reuse the backend's shared language detector
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from language_detection import detect_language
 class ChildAssessmentBot:
     def __init__(self, api_key: str):
         """Initialize the assessment bot with Gemini API"""
@@ -72,40 +76,7 @@ class ChildAssessmentBot:
 
     def detect_language(self, text: str) -> str:
         """Detect the primary language of the input text"""
-        # Hindi unicode range detection
-        hindi_chars = len(re.findall(r'[\u0900-\u097F]', text))
-        
-        # English alphabet detection
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        
-        # Common Hinglish words (Hindi words written in English)
-        hinglish_words = [
-            'hai', 'hoon', 'mein', 'tumhara', 'tumhari', 'mera', 'meri', 'kya', 'kaun', 'kahan', 
-            'kab', 'kyun', 'kaise', 'achha', 'accha', 'theek', 'thik', 'nahi', 'nahin', 'haan',
-            'ji', 'bhai', 'didi', 'yaar', 'dost', 'ghar', 'school', 'padhna', 'padhai', 'exam',
-            'teacher', 'sir', 'madam', 'mummy', 'papa', 'family', 'friends', 'matlab', 'samjha',
-            'samjhi', 'pata', 'maloom', 'dekho', 'suno', 'bolo', 'karo', 'jana', 'aana', 'khana',
-            'paani', 'time', 'bas', 'bilkul', 'sach', 'jhooth', 'kitna', 'kitni', 'bohot', 'bahut'
-        ]
-        
-        # Convert to lowercase for checking
-        text_lower = text.lower()
-        hinglish_count = sum(1 for word in hinglish_words if word in text_lower)
-        
-        total_chars = hindi_chars + english_chars
-        
-        if total_chars == 0:
-            return "mixed"
-        
-        # Determine language based on character distribution and hinglish words
-        if hindi_chars > 0 and hindi_chars / total_chars > 0.3:
-            return "hindi"
-        elif hinglish_count >= 2 or (hinglish_count >= 1 and english_chars > 0):
-            return "hinglish"
-        elif english_chars > 0:
-            return "english"
-        else:
-            return "mixed"
+        return detect_language(text)
 
     def get_initial_question(self) -> str:
         """Get the initial question in appropriate language"""
@@ -4,103 +4,145 @@ Excel to CSV Converter for School Management System
 Converts your existing Excel files to the required CSV format for import
 """
 
-import pandas as pd
+import argparse
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def convert_students_data(excel_file, output_file):
-    """Convert Excel file to students CSV format"""
+from excel_stream import DEFAULT_CHUNK_SIZE, stream_to_csv
+from schemas import SCHEMAS, ValidationReport
+
+def convert_with_schema(kind, excel_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream ``excel_file`` through the ``kind`` schema (see schemas.py) into ``output_file``
+
+    Rows that fail validation are left out and listed, with reasons, in
+    <output_file>.errors.csv.
+    """
+    schema = SCHEMAS[kind]
+    report = ValidationReport()
+    stats = stream_to_csv(excel_file, output_file, lambda chunk: schema.apply(chunk, report), chunk_size)
+    errors_file = os.path.splitext(output_file)[0] + '.errors.csv'
+    if report.rejected:
+        report.to_csv(errors_file)
+    elif os.path.exists(errors_file):
+        os.remove(errors_file)
+    return stats, report, errors_file
+
+def _report(label, output_file, stats, report, errors_file):
+    print(f"✅ {label} data converted: {output_file}")
+    print(f"📊 Records: {stats['rows']} in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
+    print(report.summary())
+    if report.rejected:
+        print(f"⚠️  Rejected rows listed in {errors_file}")
+
+def convert_students_data(excel_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Convert Excel file to students CSV format, streaming chunk_size rows at a time"""
     try:
-        # Read Excel file
-        df = pd.read_excel(excel_file)
-        
-        # Map your columns to required format
-        # Adjust these column mappings based on your Excel structure
-        column_mapping = {
-            'First Name': 'firstname',
-            'Last Name': 'lastname', 
-            'Email': 'email',
-            'Class': 'class',
-            'GPA': 'gpa',
-            'Attendance': 'attendance'
-        }
-        
-        # Rename columns
-        df_mapped = df.rename(columns=column_mapping)
-        
-        # Select only required columns
-        required_columns = ['firstname', 'lastname', 'email', 'class', 'gpa', 'attendance']
-        df_final = df_mapped[required_columns]
-        
-        # Clean data
-        df_final['gpa'] = pd.to_numeric(df_final['gpa'], errors='coerce').fillna(3.0)
-        df_final['attendance'] = pd.to_numeric(df_final['attendance'], errors='coerce').fillna(90)
-        
-        # Save to CSV
-        df_final.to_csv(output_file, index=False)
-        print(f"✅ Students data converted: {output_file}")
-        print(f"📊 Records: {len(df_final)}")
+        _report("Students", output_file, *convert_with_schema('students', excel_file, output_file, chunk_size))
         
     except Exception as e:
         print(f"❌ Error converting students data: {e}")
 
-def convert_attendance_data(excel_file, output_file):
-    """Convert Excel file to attendance CSV format"""
+def convert_attendance_data(excel_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Convert Excel file to attendance CSV format, streaming chunk_size rows at a time"""
     try:
-        df = pd.read_excel(excel_file)
-        
-        # Map your columns to required format
-        column_mapping = {
-            'Student ID': 'student_id',
-            'Date': 'date',
-            'Status': 'status',
-            'Remarks': 'remarks'
-        }
-        
-        df_mapped = df.rename(columns=column_mapping)
-        required_columns = ['student_id', 'date', 'status', 'remarks']
-        df_final = df_mapped[required_columns]
-        
-        # Format date
-        df_final['date'] = pd.to_datetime(df_final['date']).dt.strftime('%Y-%m-%d')
-        df_final['status'] = df_final['status'].fillna('Present')
-        df_final['remarks'] = df_final['remarks'].fillna('On time')
-        
-        df_final.to_csv(output_file, index=False)
-        print(f"✅ Attendance data converted: {output_file}")
-        print(f"📊 Records: {len(df_final)}")
+        _report("Attendance", output_file, *convert_with_schema('attendance', excel_file, output_file, chunk_size))
         
     except Exception as e:
         print(f"❌ Error converting attendance data: {e}")
 
-def convert_grades_data(excel_file, output_file):
-    """Convert Excel file to grades CSV format"""
+def convert_grades_data(excel_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Convert Excel file to grades CSV format, streaming chunk_size rows at a time"""
     try:
-        df = pd.read_excel(excel_file)
-        
-        column_mapping = {
-            'Student ID': 'student_id',
-            'Subject': 'subject',
-            'Grade': 'grade',
-            'Marks': 'marks',
-            'Date': 'date'
-        }
-        
-        df_mapped = df.rename(columns=column_mapping)
-        required_columns = ['student_id', 'subject', 'grade', 'marks', 'date']
-        df_final = df_mapped[required_columns]
-        
-        # Format date
-        df_final['date'] = pd.to_datetime(df_final['date']).dt.strftime('%Y-%m-%d')
-        df_final['marks'] = pd.to_numeric(df_final['marks'], errors='coerce').fillna(0)
-        
-        df_final.to_csv(output_file, index=False)
-        print(f"✅ Grades data converted: {output_file}")
-        print(f"📊 Records: {len(df_final)}")
+        _report("Grades", output_file, *convert_with_schema('grades', excel_file, output_file, chunk_size))
         
     except Exception as e:
         print(f"❌ Error converting grades data: {e}")
 
+def detect_kind(path):
+    """Guess the conversion type from the file name, as main() does"""
+    name = os.path.basename(path).lower()
+    if "combined" in name or "student" in name:
+        return 'students'
+    if "activity" in name or "attendance" in name:
+        return 'attendance'
+    if "assessments" in name or "grade" in name:
+        return 'grades'
+    return None
+
+def collect_inputs(paths):
+    """Expand directories to the .xlsx/.csv files directly inside them"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith(('.xlsx', '.csv')) and not name.startswith('~$')))
+        else:
+            files.append(path)
+    return files
+
+def convert_file(path, output_file, kind=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Convert one file; never raises, so one bad workbook can't stop a batch"""
+    result = {'file': path, 'output': output_file, 'kind': kind or detect_kind(path),
+              'rows': 0, 'seconds': 0.0, 'rejected': 0, 'errors_file': None, 'error': None}
+    try:
+        if result['kind'] is None:
+            raise ValueError("can't tell students/attendance/grades from the file name; pass --kind")
+        stats, report, errors_file = convert_with_schema(result['kind'], path, output_file, chunk_size)
+        result.update(stats, rejected=report.rejected, errors_file=errors_file if report.rejected else None)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def convert_many(paths, output_dir="converted_data", kind=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Convert many files (or directories of files) in a process pool"""
+    files = collect_inputs(paths)
+    if not files:
+        print("❌ No .xlsx or .csv files found")
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+
+    # One output per input; suffix repeated names from different folders
+    jobs, used = [], set()
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem}_{n}"
+        used.add(name)
+        jobs.append((path, os.path.join(output_dir, f"{name}.csv")))
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    print(f"🔄 Converting {len(jobs)} files with {workers} workers")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(convert_file, path, output_file, kind, chunk_size) for path, output_file in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"[{done}/{len(jobs)}] ❌ {result['file']}: {result['error']}")
+            else:
+                rejected = f", {result['rejected']} rejected" if result['rejected'] else ""
+                print(f"[{done}/{len(jobs)}] ✅ {result['file']} -> {result['output']} "
+                      f"({result['rows']} rows{rejected}, {result['rows_per_second']:,.0f} rows/s)")
+
+    elapsed = time.perf_counter() - start
+    converted = [r for r in results if not r['error']]
+    rows = sum(r['rows'] for r in converted)
+    print("\n" + "=" * 60)
+    print(f"🎉 Converted {len(converted)}/{len(results)} files, {rows} rows in {elapsed:.1f}s "
+          f"({rows / elapsed if elapsed else 0:,.0f} rows/s overall)")
+    for r in results:
+        if r['error']:
+            print(f"⚠️  Failed: {r['file']} ({r['error']})")
+        elif r['rejected']:
+            print(f"⚠️  {r['rejected']} rows rejected from {r['file']}, see {r['errors_file']}")
+    return results
+
 def main():
     """Main conversion function"""
     print("🔄 Excel to CSV Converter for School Management System")
@@ -156,9 +198,25 @@ def main():
 if __name__ == "__main__":
     # Check if pandas is installed
     try:
-        import pandas as pd
+        import pandas  # noqa: F401  (only checks that it is installed)
     except ImportError:
         print("❌ pandas not installed. Install with: pip install pandas openpyxl")
         sys.exit(1)
     
+    parser = argparse.ArgumentParser(description="Convert Excel/CSV exports to the import CSV format")
+    parser.add_argument("inputs", nargs="*", help="files or directories to convert (default: the charts/datasets workbooks)")
+    parser.add_argument("--output-dir", default="converted_data", help="where to write the CSV files")
+    parser.add_argument("--kind", choices=sorted(SCHEMAS), help="conversion type for every input (default: guess from file names)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows held in memory per file")
+    parser.add_argument("--db", help="also load the converted CSVs into this SQLite database (see db_loader.py)")
+    args = parser.parse_args()
+    
+    if args.inputs:
+        results = convert_many(args.inputs, args.output_dir, args.kind, args.workers, args.chunk_size)
+        failed = not results or any(r['error'] for r in results)
+        if args.db:
+            from db_loader import load_files
+            failed = load_files([r['output'] for r in results if not r['error']], args.db) or failed
+        sys.exit(1 if failed else 0)
     main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Bulk loader from converted CSVs into a local SQLite database.
+
+The React importer writes one document per CSV row. load_csv() instead
+streams a converted students, attendance or grades CSV in chunks and writes
+each chunk with one executemany inside a single transaction per file, so tens
+of thousands of rows load in seconds. Rows are upserted: students on
+student_id, attendance on (student_id, date) and grades on
+(student_id, subject, date), so re-importing a month's export updates rows
+instead of duplicating them.
+
+student_id is the key shared with attendance and grades (the roll number)
+and is NOT NULL in every table: a file without the column is rejected, and
+rows with an empty one are skipped and counted in the load summary.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+DEFAULT_DB_PATH = os.getenv('SCHOOL_DB_PATH', os.path.join('converted_data', 'school.db'))
+DEFAULT_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT NOT NULL PRIMARY KEY,
+    firstname TEXT,
+    lastname TEXT,
+    email TEXT,
+    class TEXT,
+    center TEXT,
+    grade INTEGER,
+    section TEXT,
+    gpa REAL,
+    attendance REAL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS attendance (
+    student_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT,
+    remarks TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (student_id, date)
+);
+CREATE TABLE IF NOT EXISTS grades (
+    student_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    date TEXT NOT NULL,
+    grade TEXT,
+    marks REAL,
+    updated_at TEXT,
+    PRIMARY KEY (student_id, subject, date)
+);
+CREATE INDEX IF NOT EXISTS idx_students_center ON students (center);
+CREATE INDEX IF NOT EXISTS idx_students_grade ON students (grade);
+CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date);
+CREATE INDEX IF NOT EXISTS idx_grades_date ON grades (date);
+"""
+
+
+# Table -> (columns written, conflict key)
+TABLES = {
+    'students': (['student_id', 'firstname', 'lastname', 'email', 'class', 'center', 'grade', 'section',
+                  'gpa', 'attendance'], ['student_id']),
+    'attendance': (['student_id', 'date', 'status', 'remarks'], ['student_id', 'date']),
+    'grades': (['student_id', 'subject', 'date', 'grade', 'marks'], ['student_id', 'subject', 'date']),
+}
+
+_CLASS_RE = re.compile(r'(\d+)\s*-?\s*([A-Za-z])?$')
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """Open the database, creating tables and indexes if needed"""
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    dropped = migrate(conn)
+    if dropped:
+        print(f"⚠️  {db_path}: removed {dropped} students without a student_id")
+    return conn
+
+
+def migrate(conn):
+    """Rebuild a students table from before student_id was NOT NULL; returns the rows left out.
+
+    Older databases stored students without a roll number under a NULL id, or
+    with their email as the id. Neither joins with attendance or grades, so
+    they are not carried over.
+    """
+    nullable = {row[1]: not row[3] for row in conn.execute('PRAGMA table_info(students)')}
+    if not nullable.get('student_id'):
+        return 0
+    columns = ', '.join(TABLES['students'][0] + ['updated_at'])
+    keep = 'student_id IS NOT NULL AND student_id IS NOT email'
+    dropped = conn.execute(f'SELECT COUNT(*) FROM students WHERE NOT ({keep})').fetchone()[0]
+    # The renamed table keeps its index names, so drop them before SCHEMA recreates them
+    conn.executescript(f"""
+    BEGIN;
+    ALTER TABLE students RENAME TO students_old;
+    DROP INDEX IF EXISTS idx_students_center;
+    DROP INDEX IF EXISTS idx_students_grade;
+    DROP INDEX IF EXISTS idx_students_email_no_id;
+    {SCHEMA}
+    INSERT INTO students ({columns}) SELECT {columns} FROM students_old WHERE {keep};
+    DROP TABLE students_old;
+    COMMIT;
+    """)
+    return dropped
+
+
+def upsert_sql(table):
+    columns, key = TABLES[table]
+    # A source without a column (NULL) keeps the value an earlier import stored
+    updates = ', '.join(f'{c} = COALESCE(excluded.{c}, {table}.{c})'
+                        for c in columns + ['updated_at'] if c not in key)
+    return (f"INSERT INTO {table} ({', '.join(columns)}, updated_at) "
+            f"VALUES ({', '.join('?' * len(columns))}, datetime('now')) "
+            f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}")
+
+
+def detect_table(columns):
+    """Pick the table from a converted CSV's header"""
+    columns = {c.lower() for c in columns}
+    if 'status' in columns:
+        return 'attendance'
+    if 'subject' in columns:
+        return 'grades'
+    return 'students'
+
+
+def prepare_students(df):
+    """Name the columns and fill center, grade and section from what the CSV has"""
+    df = df.rename(columns={'Roll No': 'student_id', 'First name': 'firstname', 'Last name': 'lastname',
+                            'Center': 'center', 'Grade': 'grade', 'Section': 'section'})
+    if 'center' not in df.columns and 'student_id' in df.columns:
+        df['center'] = df['student_id'].astype('string').str.extract(r'^([A-Z]+)', expand=False)
+    if 'class' in df.columns and ('grade' not in df.columns or 'section' not in df.columns):
+        # "Grade 10-A" -> grade 10, section A
+        parts = df['class'].astype('string').str.extract(_CLASS_RE)
+        df['grade'] = df['grade'] if 'grade' in df.columns else pd.to_numeric(parts[0], errors='coerce')
+        df['section'] = df['section'] if 'section' in df.columns else parts[1]
+    return df
+
+
+def _records(df, columns):
+    """Rows as tuples of plain Python values with NaN as NULL"""
+    frame = df.reindex(columns=columns).astype(object)
+    return list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def load_csv(conn, csv_file, table=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Upsert one converted CSV in a single transaction.
+
+    Returns (table, rows, skipped, seconds), where skipped counts the rows
+    left out because a key column (student_id, date, subject) was empty.
+    """
+    start = time.perf_counter()
+    reader = pd.read_csv(csv_file, chunksize=batch_size, dtype={'student_id': str})
+    rows = skipped = 0
+    sql = None
+    with conn:  # one transaction: commits on success, rolls back on error
+        for chunk in reader:
+            if table is None:
+                table = detect_table(chunk.columns)
+            if table == 'students':
+                chunk = prepare_students(chunk)
+            key = TABLES[table][1]
+            if sql is None:
+                missing = [c for c in key if c not in chunk.columns]
+                if missing:
+                    raise ValueError(f"{table}: no column for {', '.join(missing)} "
+                                     f"(found: {', '.join(map(str, chunk.columns))})")
+                sql = upsert_sql(table)
+            keyed = chunk[key].notna().all(axis=1)
+            skipped += int((~keyed).sum())
+            chunk = chunk[keyed]
+            conn.executemany(sql, _records(chunk, TABLES[table][0]))
+            rows += len(chunk)
+    return table, rows, skipped, time.perf_counter() - start
+
+
+def load_files(csv_files, db_path=DEFAULT_DB_PATH, batch_size=DEFAULT_BATCH_SIZE):
+    """Load several converted CSVs; a failing file is reported and rolled back alone"""
+    conn = connect(db_path)
+    failed = []
+    try:
+        for csv_file in csv_files:
+            try:
+                table, rows, skipped, seconds = load_csv(conn, csv_file, batch_size=batch_size)
+                rate = rows / seconds if seconds else 0
+                print(f"✅ {csv_file} -> {table}: {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+                if skipped:
+                    print(f"⚠️  {csv_file}: {skipped} rows skipped with an empty "
+                          f"{', '.join(TABLES[table][1])}")
+            except Exception as e:
+                failed.append(csv_file)
+                print(f"❌ Error loading {csv_file}: {e}")
+    finally:
+        conn.close()
+    print(f"📂 Database: {db_path}")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load converted CSVs into a local SQLite database")
+    parser.add_argument("csv_files", nargs="+", help="converted students/attendance/grades CSVs")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per executemany")
+    args = parser.parse_args()
+    sys.exit(1 if load_files(args.csv_files, args.db, args.batch_size) else 0)
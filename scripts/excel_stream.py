@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Streaming, chunked reading of Excel and CSV exports.
+
+pd.read_excel materialises the whole sheet (and openpyxl's full object model)
+before anything can be written out, so a year of daily attendance for every
+student needs several times the file size in RAM. iter_chunks() instead
+reads rows through openpyxl's read-only mode and yields DataFrames of at most
+chunk_size rows; stream_to_csv() cleans and appends each chunk to the output,
+so memory stays bounded by the chunk size whatever the file size.
+
+Blank rows are dropped, but every chunk's index stays tied to the file: row
+``i`` of the index is line ``i + 2`` of the sheet or CSV (the numbering
+read_csv gives a file with its header on line 1), so validation errors point
+at the right line even after blank rows.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = int(os.getenv('CONVERT_CHUNK_SIZE', '50000'))
+
+# File line of index 0
+INDEX_LINE_OFFSET = 2
+
+
+def _header(row):
+    """Column names like pd.read_excel: Unnamed: i for blanks, .1 suffixes for repeats"""
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = f'Unnamed: {i}' if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _frame(records, columns, lines):
+    df = pd.DataFrame.from_records(records, columns=columns)
+    df.index = pd.Index(lines, dtype='int64') - INDEX_LINE_OFFSET
+    return df
+
+
+def iter_excel_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, sheet_name=None):
+    """Yield a sheet as DataFrames of at most ``chunk_size`` rows"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        # min_row=1 yields every row, blank ones included, so counting gives the sheet line
+        rows = enumerate(ws.iter_rows(min_row=1, values_only=True), start=1)
+
+        columns = None
+        for _, row in rows:
+            if any(value is not None for value in row):
+                columns = _header(row)
+                break
+        if columns is None:
+            return
+
+        width = len(columns)
+        buffer, lines = [], []
+        for line, row in rows:
+            if all(value is None for value in row):
+                continue
+            # Read-only rows can be ragged; pad or trim them to the header
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            buffer.append(row[:width])
+            lines.append(line)
+            if len(buffer) >= chunk_size:
+                yield _frame(buffer, columns, lines)
+                buffer, lines = [], []
+        if buffer:
+            yield _frame(buffer, columns, lines)
+    finally:
+        wb.close()
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, sheet_name=None):
+    """Yield an .xlsx sheet or a .csv file in chunks"""
+    if path.lower().endswith('.csv'):
+        # Blank lines are kept while reading so the index still counts them, then dropped
+        for chunk in pd.read_csv(path, chunksize=chunk_size, skip_blank_lines=False):
+            yield chunk.dropna(how='all')
+    else:
+        yield from iter_excel_chunks(path, chunk_size, sheet_name)
+
+
+def stream_to_csv(path, output_file, transform=None, chunk_size=DEFAULT_CHUNK_SIZE, sheet_name=None):
+    """Convert ``path`` to CSV chunk by chunk.
+
+    Args:
+        path (str): .xlsx or .csv input
+        output_file (str): CSV to write
+        transform (callable): Optional ``chunk -> chunk`` cleaning step
+        chunk_size (int): Rows held in memory at a time
+        sheet_name (str): Sheet to read; the first sheet by default
+
+    Returns:
+        dict: rows, seconds and rows_per_second
+    """
+    start = time.perf_counter()
+    rows = 0
+    header = True
+    tmp = output_file + '.part'
+    try:
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            empty = None
+            for chunk in iter_chunks(path, chunk_size, sheet_name):
+                if transform:
+                    chunk = transform(chunk)
+                if chunk.empty:
+                    empty = chunk  # all blank, or every row rejected by ``transform``
+                    continue
+                # The header goes with the first chunk that has rows, and only once
+                chunk.to_csv(f, header=header, index=False)
+                header = False
+                rows += len(chunk)
+            if header and empty is not None:
+                empty.to_csv(f, index=False)  # no rows at all: still write the header
+    except BaseException:
+        os.remove(tmp)
+        raise
+    # Only replace the previous output once the whole file converted
+    os.replace(tmp, output_file)
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else 0.0}
+
+
+if __name__ == '__main__':
+    # python excel_stream.py <input.xlsx|csv> <output.csv> [chunk_size]
+    if len(sys.argv) < 3:
+        print("Usage: python excel_stream.py <input.xlsx> <output.csv> [chunk_size]")
+        sys.exit(1)
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHUNK_SIZE
+    stats = stream_to_csv(sys.argv[1], sys.argv[2], chunk_size=size)
+    print(f"✅ {sys.argv[2]}: {stats['rows']} rows in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s)")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+DuckDB query layer over the students, attendance and grades files.
+
+The CSVs are registered as DuckDB views (every students*.csv, attendance*.csv
+and grades*.csv in the data directory, so monthly exports stack up into one
+history). Students are joined to attendance and grades on student_id only;
+students files without one (converted exports keyed by email) cannot be
+broken down per class, and those queries raise an error instead.
+Parquet files and the Feather workbook caches written by student_data.py are
+registered too (the Feather ones are read into memory first). Queries run
+vectorized inside DuckDB; only the aggregated result comes back as a pandas
+DataFrame.
+
+    python queries.py attendance --by class
+    python queries.py below --attendance 75 --marks 40
+"""
+
+import argparse
+import glob
+import os
+
+import duckdb
+
+from student_data import CACHE_DIR_NAME
+
+DATA_DIR = os.getenv(
+    'SCHOOL_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data'),
+)
+
+# Statuses that count as attending
+ATTENDED = ('Present', 'Late')
+
+
+def _sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SchoolQueries:
+    """A DuckDB connection with the school data registered as views"""
+
+    def __init__(self, data_dir=DATA_DIR, cache_dirs=(), database=':memory:'):
+        self.con = duckdb.connect(database)
+        self.views = []
+        self.student_ids = False
+        for name in ('students', 'attendance', 'grades'):
+            files = sorted(glob.glob(os.path.join(data_dir, f'{name}*.csv')))
+            if files:
+                self._register_csv(name, files)
+        for directory in cache_dirs:
+            self.register_cache_dir(directory)
+
+    def _register_csv(self, name, files):
+        paths = '[' + ', '.join(_sql_string(f) for f in files) + ']'
+        source = f"read_csv_auto({paths}, union_by_name = true, header = true)"
+        if name == 'students':
+            columns = {row[0] for row in self.con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+            self.student_ids = 'student_id' in columns
+        self.con.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {source}")
+        self.views.append(name)
+
+    def register_cache_dir(self, directory):
+        """Register Parquet files and student_data Feather caches in ``directory``"""
+        for path in sorted(glob.glob(os.path.join(directory, '*.parquet'))):
+            name = _view_name(path)
+            self.con.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM read_parquet({_sql_string(path)})")
+            self.views.append(name)
+        for path in sorted(glob.glob(os.path.join(directory, '*.feather'))):
+            import pyarrow.feather as feather
+
+            # to_feather compresses with LZ4 by default, so the table is decompressed
+            # into memory here despite memory_map; DuckDB then scans that Arrow
+            # table without converting it to pandas
+            name = _view_name(path)
+            self.con.register(name, feather.read_table(path, memory_map=True))
+            self.views.append(name)
+
+    def _require_student_ids(self):
+        """Per-class queries join students on student_id, which attendance and grades share"""
+        if 'students' not in self.views:
+            raise ValueError("Per-class breakdowns need a students file; none was found")
+        if not self.student_ids:
+            raise ValueError("Per-class breakdowns are not available: the students files have no "
+                             "student_id column to match attendance and grades against")
+
+    def query(self, sql, params=None):
+        return self.con.execute(sql, params or []).df()
+
+    def attendance_rate(self, by='student', start=None, end=None):
+        """Share of attended days per student, class or date (optionally within a date range)"""
+        group = {'student': 'a.student_id', 'class': 's.class', 'date': 'a.date'}[by]
+        join = ''
+        if by == 'class':
+            self._require_student_ids()
+            join = 'LEFT JOIN students s USING (student_id)'
+        attended = ', '.join(_sql_string(s) for s in ATTENDED)
+        return self.query(f"""
+            SELECT {group} AS {by},
+                   count(*) AS days,
+                   count(*) FILTER (WHERE a.status IN ({attended})) AS attended,
+                   round(100.0 * attended / days, 1) AS attendance_rate
+            FROM attendance a {join}
+            WHERE (? IS NULL OR a.date >= ?) AND (? IS NULL OR a.date <= ?)
+            GROUP BY ALL
+            ORDER BY attendance_rate, {by}
+        """, [start, start, end, end])
+
+    def subject_averages(self, by_class=False):
+        """Average, lowest and highest marks per subject (and class)"""
+        if by_class:
+            self._require_student_ids()
+            return self.query("""
+                SELECT s.class, g.subject, count(*) AS results, round(avg(g.marks), 1) AS average_marks,
+                       min(g.marks) AS lowest, max(g.marks) AS highest
+                FROM grades g LEFT JOIN students s USING (student_id)
+                GROUP BY ALL ORDER BY s.class, g.subject
+            """)
+        return self.query("""
+            SELECT subject, count(*) AS results, round(avg(marks), 1) AS average_marks,
+                   min(marks) AS lowest, max(marks) AS highest
+            FROM grades GROUP BY subject ORDER BY subject
+        """)
+
+    def students_below(self, attendance=75.0, marks=40.0):
+        """Students whose attendance rate or average marks fall below the thresholds"""
+        attended = ', '.join(_sql_string(s) for s in ATTENDED)
+        return self.query(f"""
+            WITH rates AS (
+                SELECT student_id,
+                       100.0 * count(*) FILTER (WHERE status IN ({attended})) / count(*) AS attendance_rate
+                FROM attendance GROUP BY student_id
+            ),
+            marks AS (
+                SELECT student_id, avg(marks) AS average_marks FROM grades GROUP BY student_id
+            )
+            SELECT student_id, round(r.attendance_rate, 1) AS attendance_rate,
+                   round(m.average_marks, 1) AS average_marks,
+                   coalesce(r.attendance_rate < ?, false) AS low_attendance,
+                   coalesce(m.average_marks < ?, false) AS low_marks
+            FROM rates r FULL OUTER JOIN marks m USING (student_id)
+            WHERE r.attendance_rate < ? OR m.average_marks < ?
+            ORDER BY student_id
+        """, [attendance, marks, attendance, marks])
+
+    def assessment_summary(self, view, by=('Center_Name', 'Grade')):
+        """Students and mean Total % per group from a registered assessments cache"""
+        columns = ', '.join(f'"{c}"' for c in by)
+        return self.query(f"""
+            SELECT {columns}, count(*) AS students, round(avg("Total %"), 2) AS average_percent
+            FROM {view} GROUP BY ALL ORDER BY {columns}
+        """)
+
+
+def _view_name(path):
+    """complete_data.xlsx.0.typed_assessments.feather -> complete_data_typed_assessments"""
+    parts = os.path.basename(path).split('.')
+    stem = parts[0] if len(parts) < 4 else f"{parts[0]}_{parts[-2]}"
+    return ''.join(c if c.isalnum() else '_' for c in stem)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aggregate queries over the school CSVs with DuckDB")
+    parser.add_argument("query", choices=['attendance', 'subjects', 'below', 'views'])
+    parser.add_argument("--data-dir", default=DATA_DIR, help="folder with students/attendance/grades CSVs")
+    parser.add_argument("--cache-dir", action='append', default=[],
+                        help=f"folder with Parquet files or {CACHE_DIR_NAME}/ Feather caches to register")
+    parser.add_argument("--by", choices=['student', 'class', 'date'], default='student')
+    parser.add_argument("--by-class", action='store_true', help="subject averages per class")
+    parser.add_argument("--attendance", type=float, default=75.0, help="attendance threshold (%%)")
+    parser.add_argument("--marks", type=float, default=40.0, help="average marks threshold")
+    args = parser.parse_args()
+
+    school = SchoolQueries(args.data_dir, args.cache_dir)
+    if args.query == 'views':
+        print('\n'.join(school.views))
+        raise SystemExit(0)
+    try:
+        if args.query == 'attendance':
+            result = school.attendance_rate(args.by)
+        elif args.query == 'subjects':
+            result = school.subject_averages(args.by_class)
+        else:
+            result = school.students_below(args.attendance, args.marks)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(result.to_string(index=False))
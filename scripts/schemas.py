@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Declarative schemas for the students, attendance and grades imports.
+
+Each Schema lists its output columns with a type, the source headers it may
+come from, allowed values or ranges, a date format and an optional default.
+Schema.apply() renames, coerces and checks whole columns at once (no per-row
+Python), so a 1M-row attendance import is validated in seconds.
+
+Missing values with a default are filled and counted; anything that cannot be
+coerced or fails a check is collected in a ValidationReport (file line,
+column, value, reason) and the row is left out of the output, instead of
+being silently replaced with a default.
+"""
+
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# First data row of a sheet or CSV is line 2 (the header is line 1)
+FIRST_DATA_LINE = 2
+
+
+class SchemaError(ValueError):
+    """The input is missing a required column, so no row can be converted"""
+
+
+class Column:
+    """One output column: its type, where it comes from and what it may hold"""
+
+    def __init__(self, name, dtype='str', sources=(), required=True, default=None,
+                 allowed=None, min_value=None, max_value=None, date_format=None, pattern=None):
+        self.name = name
+        self.dtype = dtype            # 'str', 'float', 'int' or 'date'
+        self.sources = (name,) + tuple(sources)
+        self.required = required      # a missing value without a default is an error
+        self.default = default
+        self.allowed = allowed        # canonical values, matched case-insensitively
+        self.min_value = min_value
+        self.max_value = max_value
+        self.date_format = date_format
+        self.pattern = re.compile(pattern) if pattern else None
+
+
+def _header_key(name):
+    return re.sub(r'[\s_]+', ' ', str(name)).strip().lower()
+
+
+class ValidationReport:
+    """Invalid values across one or more chunks, plus counts of filled defaults"""
+
+    def __init__(self):
+        self._errors = []
+        self.filled = {}
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def add(self, lines, column, values, reason):
+        if len(lines):
+            self._errors.append(pd.DataFrame({
+                'line': lines, 'column': column, 'value': np.asarray(values, dtype=object), 'reason': reason,
+            }))
+
+    @property
+    def errors(self):
+        if not self._errors:
+            return pd.DataFrame(columns=['line', 'column', 'value', 'reason'])
+        return pd.concat(self._errors, ignore_index=True).sort_values('line', kind='stable')
+
+    @property
+    def rejected(self):
+        return self.rows_in - self.rows_out
+
+    def summary(self, examples=5):
+        """A few lines per (column, reason), with the first offending file lines"""
+        lines = [f"{self.rows_out}/{self.rows_in} rows valid, {self.rejected} rejected"]
+        for column, count in self.filled.items():
+            if count:
+                lines.append(f"  {column}: {count} missing values filled with the default")
+        errors = self.errors
+        if not errors.empty:
+            for (column, reason), group in errors.groupby(['column', 'reason'], sort=False):
+                shown = ', '.join(map(str, group['line'].head(examples)))
+                more = f" (+{len(group) - examples} more)" if len(group) > examples else ''
+                lines.append(f"  {column}: {reason} on {len(group)} rows, lines {shown}{more}")
+        return '\n'.join(lines)
+
+    def to_csv(self, path):
+        self.errors.to_csv(path, index=False)
+
+
+class Schema:
+    """An ordered set of Columns for one kind of import"""
+
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+
+    def _resolve_sources(self, df):
+        """Map each output column to the input header it is read from"""
+        headers = {_header_key(c): c for c in df.columns}
+        mapping, missing = {}, []
+        for column in self.columns:
+            found = next((headers[_header_key(s)] for s in column.sources if _header_key(s) in headers), None)
+            if found is not None:
+                mapping[column.name] = found
+            elif column.required and column.default is None:
+                missing.append(column.name)
+        if missing:
+            raise SchemaError(f"{self.name}: no column for {', '.join(missing)} "
+                              f"(found: {', '.join(map(str, df.columns))})")
+        return mapping
+
+    def apply(self, df, report=None):
+        """Validate and coerce ``df``; returns only the valid rows, in schema order"""
+        report = report if report is not None else ValidationReport()
+        mapping = self._resolve_sources(df)
+        lines = df.index.to_numpy() + FIRST_DATA_LINE
+        bad = np.zeros(len(df), dtype=bool)
+        out = {}
+
+        for column in self.columns:
+            if column.name in mapping:
+                raw = df[mapping[column.name]]
+            else:
+                raw = pd.Series(np.nan, index=df.index, dtype=object)
+            value, invalid, reasons = self._coerce(column, raw)
+
+            for mask, reason in reasons:
+                report.add(lines[mask], column.name, raw.to_numpy()[mask], reason)
+                bad |= mask
+
+            missing = value.isna().to_numpy() & ~invalid
+            if column.default is not None:
+                count = int(missing.sum())
+                report.filled[column.name] = report.filled.get(column.name, 0) + count
+                if count:
+                    value = value.fillna(column.default)
+            elif column.required and missing.any():
+                report.add(lines[missing], column.name, raw.to_numpy()[missing], 'missing')
+                bad |= missing
+            out[column.name] = value
+
+        result = pd.DataFrame(out, index=df.index)[~bad]
+        report.rows_in += len(df)
+        report.rows_out += len(result)
+        return result
+
+    @staticmethod
+    def _coerce(column, raw):
+        """Return (values, invalid mask, [(mask, reason), ...]) for one column"""
+        present = raw.notna().to_numpy()
+        if raw.dtype == object or pd.api.types.is_string_dtype(raw):
+            text = raw.astype('string').str.strip()
+            present = present & (text != '').fillna(False).to_numpy()
+        else:
+            text = None
+        reasons = []
+
+        if column.dtype in ('float', 'int'):
+            value = pd.to_numeric(raw, errors='coerce')
+            invalid = present & value.isna().to_numpy()
+            reasons.append((invalid, 'not a number'))
+            if column.dtype == 'int':
+                fractional = (value.notna() & (value % 1 != 0)).to_numpy()
+                reasons.append((fractional, 'not a whole number'))
+                invalid = invalid | fractional
+        elif column.dtype == 'date':
+            value = pd.to_datetime(raw, format=column.date_format, errors='coerce')
+            invalid = present & value.isna().to_numpy()
+            reasons.append((invalid, f"not a date ({column.date_format})" if column.date_format else 'not a date'))
+        else:
+            value = text if text is not None else raw.astype('string')
+            invalid = np.zeros(len(raw), dtype=bool)
+
+        value = value.where(pd.Series(present, index=raw.index))
+
+        if column.min_value is not None:
+            low = (value < column.min_value).fillna(False).to_numpy()
+            reasons.append((low, f"below {column.min_value}"))
+            invalid = invalid | low
+        if column.max_value is not None:
+            high = (value > column.max_value).fillna(False).to_numpy()
+            reasons.append((high, f"above {column.max_value}"))
+            invalid = invalid | high
+        if column.pattern is not None:
+            mismatch = present & ~value.str.fullmatch(column.pattern).fillna(False).to_numpy()
+            reasons.append((mismatch, 'wrong format'))
+            invalid = invalid | mismatch
+        if column.allowed is not None:
+            canonical = {str(v).lower(): v for v in column.allowed}
+            mapped = value.str.lower().map(canonical)
+            unknown = present & mapped.isna().to_numpy()
+            reasons.append((unknown, f"not one of {', '.join(map(str, column.allowed))}"))
+            invalid = invalid | unknown
+            value = mapped
+
+        if column.dtype == 'date':
+            value = value.dt.strftime('%Y-%m-%d')
+        elif column.dtype == 'int':
+            value = value.astype('Int64')
+        return value, invalid, reasons
+
+
+STUDENTS = Schema('students', [
+    Column('student_id', sources=['Student ID', 'Roll No'], required=False),
+    Column('firstname', sources=['First Name', 'First_Name']),
+    Column('lastname', sources=['Last Name', 'Last_Name']),
+    Column('email', sources=['Email', 'E-mail'], pattern=r'[^@\s]+@[^@\s]+\.[^@\s]+'),
+    Column('class', sources=['Class', 'Grade']),
+    Column('gpa', 'float', sources=['GPA'], default=3.0, min_value=0, max_value=4),
+    Column('attendance', 'float', sources=['Attendance', 'Attendance %'], default=90, min_value=0, max_value=100),
+])
+
+ATTENDANCE = Schema('attendance', [
+    Column('student_id', sources=['Student ID', 'Roll No']),
+    Column('date', 'date', sources=['Date']),
+    Column('status', sources=['Status'], default='Present', allowed=['Present', 'Absent', 'Late', 'Excused']),
+    Column('remarks', sources=['Remarks', 'Notes'], default='On time'),
+])
+
+GRADES = Schema('grades', [
+    Column('student_id', sources=['Student ID', 'Roll No']),
+    Column('subject', sources=['Subject']),
+    Column('grade', sources=['Grade'], required=False,
+           allowed=['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D', 'E', 'F']),
+    Column('marks', 'float', sources=['Marks', 'Score'], min_value=0, max_value=100),
+    Column('date', 'date', sources=['Date']),
+])
+
+SCHEMAS = {schema.name: schema for schema in (STUDENTS, ATTENDANCE, GRADES)}
+
+
+if __name__ == '__main__':
+    # Validate without converting: python schemas.py <students|attendance|grades> <file.csv|xlsx>
+    if len(sys.argv) != 3 or sys.argv[1] not in SCHEMAS:
+        print(f"Usage: python schemas.py <{'|'.join(SCHEMAS)}> <file>")
+        sys.exit(1)
+    from excel_stream import iter_chunks
+
+    validation = ValidationReport()
+    for chunk in iter_chunks(sys.argv[2]):
+        SCHEMAS[sys.argv[1]].apply(chunk, validation)
+    print(validation.summary())
+    sys.exit(1 if validation.rejected else 0)
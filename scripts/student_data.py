@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Shared data loading for the student workbooks.
+
+Parsing .xlsx with openpyxl is by far the slowest step of every script that
+reads them (insights.py, convert_excel_to_csv.py, AdminPDF.py). read_workbook()
+parses each sheet once and keeps a typed Feather (Arrow IPC) copy next to the
+workbook in a .cache/ folder. The copy is reused while the workbook's mtime and
+size are unchanged, or while its content hash still matches after a touch.
+Without pyarrow the cache falls back to pickle.
+
+Derived columns such as Center / Center_Name are computed before caching,
+so they are stored with the data instead of being recomputed on every load.
+
+load_assessments() also stores compact dtypes (ASSESSMENT_DTYPES): categoricals
+for the center, section, gender and location columns, int8 question scores
+and float32 percentages. `python student_data.py --memory-report <workbook>`
+compares that against the plain object/int64 frame.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+
+import pandas as pd
+
+CACHE_DIR_NAME = '.cache'
+
+CENTERS = {'BIH': 'Bihar', 'PAT': 'Patna', 'SMT': 'SMT'}
+
+QUESTION_COLS = ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6', 'Q7', 'Q8', 'Q9', 'Q10']
+
+# Compact dtypes for the assessments frame
+ASSESSMENT_DTYPES = {
+    'Center': 'category',
+    'Center_Name': 'category',
+    'Section': 'category',
+    'Gender (M/F)': 'category',
+    'Mandal': 'category',
+    'Village Name': 'category',
+    'Grade': 'int8',
+    'Grade LL': 'int8',
+    'DOB /Age': 'int8',
+    **{q: 'int8' for q in QUESTION_COLS},
+    'Total Score': 'int16',
+    'Total Marks': 'int16',
+    'Total %': 'float32',
+}
+
+# A categorical only saves memory when values repeat; past this share of
+# distinct values the column stays a string column
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _derive_id(derive):
+    """Identify a derive function by name and source, so edits invalidate the cache"""
+    if derive is None:
+        return None
+    source = inspect.getsource(derive)
+    return f"{derive.__module__}.{derive.__qualname__}:{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _cache_paths(path, sheet_name, derive):
+    directory, name = os.path.split(os.path.abspath(path))
+    variant = derive.__name__ if derive else 'raw'
+    base = os.path.join(directory, CACHE_DIR_NAME, f"{name}.{sheet_name}.{variant}")
+    return base, base + '.json'
+
+
+def write_frame(df, base):
+    """Write Feather if pyarrow can encode the frame, else pickle; return the format used"""
+    try:
+        df.reset_index(drop=True).to_feather(base + '.feather')
+        return 'feather'
+    except Exception:
+        # pyarrow is missing or cannot encode a mixed-type object column
+        if os.path.exists(base + '.feather'):
+            os.remove(base + '.feather')
+        with open(base + '.pkl', 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return 'pickle'
+
+
+def read_frame(base, fmt):
+    """Read a frame written by write_frame() in the format it returned"""
+    if fmt == 'feather':
+        return pd.read_feather(base + '.feather')
+    with open(base + '.pkl', 'rb') as f:
+        return pickle.load(f)
+
+
+def read_workbook(path, sheet_name=0, derive=None, use_cache=True):
+    """Read one sheet of an Excel workbook through the columnar cache.
+
+    Args:
+        path (str): Path to the .xlsx file
+        sheet_name (int or str): Sheet to read, as for pd.read_excel
+        derive (callable): Optional ``df -> df`` applied before caching
+        use_cache (bool): Set False to always parse the workbook
+
+    Returns:
+        pd.DataFrame: The sheet, with derived columns
+    """
+    if not use_cache:
+        df = pd.read_excel(path, sheet_name=sheet_name)
+        return derive(df) if derive else df
+
+    base, meta_path = _cache_paths(path, sheet_name, derive)
+    stat = os.stat(path)
+    derive_id = _derive_id(derive)
+
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('derive') != derive_id:
+            meta = None
+
+    if meta is not None:
+        if meta['mtime'] == stat.st_mtime and meta['size'] == stat.st_size:
+            return read_frame(base, meta['format'])
+        # Touched but possibly unchanged (e.g. re-copied): compare contents
+        sha = file_sha256(path)
+        if sha == meta['sha256']:
+            meta.update(mtime=stat.st_mtime, size=stat.st_size)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            return read_frame(base, meta['format'])
+    else:
+        sha = file_sha256(path)
+
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    if derive:
+        df = derive(df)
+
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    fmt = write_frame(df, base)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': sha,
+                   'derive': derive_id, 'format': fmt}, f)
+    return df
+
+
+def add_center_columns(df):
+    """Add Center (Roll No prefix) and Center_Name columns"""
+    df = df.copy()
+    df['Center'] = df['Roll No'].str.extract(r'^([A-Z]+)')[0]
+    df['Center_Name'] = df['Center'].map(CENTERS)
+    return df
+
+
+def compact_dtypes(df, dtypes=ASSESSMENT_DTYPES):
+    """Downcast the columns listed in ``dtypes``; integer columns with gaps become nullable"""
+    df = df.copy()
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if dtype == 'category':
+            if series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                df[column] = series.astype('category')
+        elif dtype.startswith('int'):
+            values = pd.to_numeric(series, errors='coerce')
+            df[column] = values.astype(dtype.capitalize() if values.isna().any() else dtype)
+        else:
+            df[column] = pd.to_numeric(series, errors='coerce').astype(dtype)
+    return df
+
+
+def typed_assessments(df):
+    """Center columns plus compact dtypes, computed once before caching"""
+    return compact_dtypes(add_center_columns(df))
+
+
+def load_assessments(path, typed=True):
+    """Load the assessments workbook with the Center columns already derived"""
+    return read_workbook(path, derive=typed_assessments if typed else add_center_columns)
+
+
+def memory_report(before, after):
+    """Per-column dtype and deep memory use of two versions of a frame"""
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_before': before.memory_usage(deep=True, index=False),
+        'bytes_after': after.memory_usage(deep=True, index=False),
+    })
+    report.loc['TOTAL'] = ['', '', report['bytes_before'].sum(), report['bytes_after'].sum()]
+    report['ratio'] = (report['bytes_before'] / report['bytes_after']).round(1)
+    return report
+
+
+if __name__ == '__main__':
+    # Warm the cache: python student_data.py <workbook.xlsx> [...]
+    # Compare dtypes: python student_data.py --memory-report <assessments.xlsx>
+    if sys.argv[1:2] == ['--memory-report']:
+        for workbook in sys.argv[2:]:
+            plain = load_assessments(workbook, typed=False)
+            typed = load_assessments(workbook)
+            # Object strings, as pandas < 3 loads them, for a like-for-like baseline
+            legacy = plain.astype({c: object for c in plain.columns if pd.api.types.is_string_dtype(plain[c])})
+            print(f"📊 {workbook}: {len(typed)} rows")
+            print(memory_report(legacy, typed).to_string())
+        sys.exit(0)
+    for workbook in sys.argv[1:]:
+        frame = read_workbook(workbook)
+        print(f"✅ Cached {workbook}: {len(frame)} rows")
@@ -1,20 +1,41 @@
 import pandas as pd
+import json
+import logging
 import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import google.generativeai as genai
-from fpdf import FPDF
 
-def generate_health_report(csv_file_path, output_pdf_name="diksha_health_report.pdf"):
-    """
-    Generate a health report PDF from student data in a CSV file.
-    
-    Args:
-        csv_file_path (str): Path to the CSV file containing student data
-        output_pdf_name (str): Name of the output PDF file (default: "diksha_health_report.pdf")
-    
-    Returns:
-        str: Path to the generated PDF file
-    """
+# Shared Gemini helpers live in the backend package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from gemini_client import get_client
+from rate_limiter import PRIORITY_BATCH
+from report_renderer import render_batch, stream_report
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from student_data import add_center_columns, read_workbook
+
+from health_delta import SNAPSHOT_PATH, describe_changes, save_snapshot, screen_incremental
+from health_screening import SCREENING_RULES, flagged_students, group_label, screen_students, summarize
+from report_cache import ReportCache, data_hash, report_key
+from report_mapreduce import REPORT_WORKERS, generate_narrative
+
+logger = logging.getLogger(__name__)
+
+# Flagged students per rendered block of a streamed report
+REPORT_BLOCK_LINES = int(os.getenv("REPORT_BLOCK_LINES", "2000"))
+
+MODEL_NAME = "gemini-1.5-flash"
+# Bump when the health prompts (here or in report_mapreduce.py) change, so cached reports are rebuilt
+PROMPT_VERSION = 3
+
+# Relevant health columns
+REQUIRED_COLUMNS = ["Roll No", "Name of the Student", "Grade", "Height (cm)", "Weight (kg)"]
+
+def _gemini_client():
+    """Configure Gemini from GEMINI_API_KEY and return the shared client"""
     # Load environment variables
     load_dotenv()
     
@@ -25,8 +46,10 @@ def generate_health_report(csv_file_path, output_pdf_name="diksha_health_report.
     
     # Configure Gemini
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    
+    return get_client(MODEL_NAME)
+
+def load_roster(csv_file_path):
+    """Read the roster CSV: the health columns plus Center"""
     # Load CSV file
     try:
         df = pd.read_csv(csv_file_path)
@@ -35,86 +58,208 @@ def generate_health_report(csv_file_path, output_pdf_name="diksha_health_report.
     except Exception as e:
         raise Exception(f"Error reading CSV file: {e}")
     
-    # Select relevant health columns
-    required_columns = ["Roll No", "Name of the Student", "Grade", "Height (cm)", "Weight (kg)"]
-    
     # Check if all required columns exist
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing_columns:
         raise ValueError(f"Missing required columns: {missing_columns}")
     
-    health_df = df[required_columns]
-    
-    # Convert to JSON
-    health_json = health_df.to_json(orient="records", indent=2)
+    return add_center_columns(df[REQUIRED_COLUMNS].astype({"Roll No": str}))
+
+def load_screened(csv_file_path):
+    """Read the roster CSV and screen it (see health_screening.py)"""
+    # Classify and flag locally; only aggregate statistics go to Gemini
+    return screen_students(load_roster(csv_file_path))
+
+def write_narrative(client, screened, stats, map_reduce=False, max_workers=REPORT_WORKERS):
+    """Gemini's summary and suggestions for ``stats``: one call, or map-reduce when asked"""
+    if map_reduce:
+        return generate_narrative(client, screened, stats, max_workers)
     
-    # Generate content using Gemini
     prompt = f"""
 You are a admin working for the Diksha Foundation.
 
-Below is the data of students, each with:
-- Roll Number
-- Name
-- Grade
-- Height (in cm)
-- Weight (in kg)
+{SCREENING_RULES}
+
+Screening results (computed exactly, as JSON):
 
-{health_json}
+{json.dumps(stats, indent=2)}
 
 Your task:
 
-1. Classify each student into the following age group categories:
-
-| Age Group | Expected Height (cm) | Expected Weight (kg) |
-|-----------|----------------------|-----------------------|
-| 5-7       | 105-120              | 10-16                 |
-| 8-10      | 120-135              | 13-22                 |
-| 11-13     | 135-150              | 22-35                 |
-| 14-16     | 150-165              | 35-50                 |
-| 17+       | 165-175              | 45-60                 |
-
-2. Since age is not directly provided, infer age group based on **grade**:
-   - Grade 1-2 → 5-7 years
-   - Grade 3-5 → 8-10 years
-   - Grade 6-7 → 11-13 years
-   - Grade 8-10 → 14-16 years
-   - Grade 11+ → 17+ years
-
-3. For each student:
-   - Classify them into an age group
-   - Compare their height and weight against the minimum thresholds for their group
-   - Flag students who are below **either** minimum height **or** weight for their age group
-
-4. Generate a clear report with:
-   - Detailed summary: number of students falling below health standards. NO TABLES
-   - A list listing flagged students with their Name and roll no grouped by their class and center.
+Generate a clear report with:
+   - Detailed summary: number of students falling below health standards, overall and by age group, center and grade. NO TABLES
    - General suggestions for health interventions (nutrition, referrals, etc.)
 
+The list of flagged students is added separately, do not invent one.
 Output in structured text format. Give a very detailed summary of the stats. Avoid using markdown format text in answer (no asterisks)
 """
+    # Report generation yields to live chats sharing the same API key
+    return client.generate_text(prompt, priority=PRIORITY_BATCH)
+
+def _flagged_groups(screened):
+    """(heading, lines) per center and class, listing the flagged students"""
+    flagged = flagged_students(screened)
+    # dropna=False: students whose Roll No gives no center are listed under "Unknown", not dropped
+    for (center, grade), group in flagged.groupby(["Center", "Grade"], sort=False, dropna=False):
+        lines = []
+        rows = zip(group["Name of the Student"], group["Roll No"], group["Below Height"], group["Below Weight"])
+        for name, roll_no, below_height, below_weight in rows:
+            reasons = " and ".join(r for r, below in (("height", below_height), ("weight", below_weight)) if below)
+            lines.append(f"{name} (Roll No {roll_no}): below minimum {reasons}")
+        yield f"Center {group_label(center)}, Grade {group_label(grade)}", lines
+
+def _flagged_title(screened):
+    return f"Flagged Students ({int(screened['Flagged'].sum())} of {len(screened)})"
+
+def health_report_data(narrative, screened, title=None):
+    """Content for the "health" template of report_renderer.py"""
+    data = {
+        "narrative": narrative,
+        "flagged_title": _flagged_title(screened),
+        "flagged": [{"heading": heading, "lines": lines} for heading, lines in _flagged_groups(screened)],
+    }
+    if title:
+        data["title"] = title
+    return data
+
+def health_report_blocks(narrative, screened, title=None, block_lines=REPORT_BLOCK_LINES, changes=None):
+    """The health report as ("health", data) blocks of about ``block_lines`` flagged students
+
+    Fed to report_renderer.stream_report, only one block is rendered and held
+    in memory at a time, however many students are flagged. ``changes`` (from
+    health_delta.screen_incremental) adds a paragraph on what changed since
+    the previous run.
+    """
+    extra = {"title": title} if title else {}
+    if changes is not None:
+        narrative = f"{narrative}\n\n{describe_changes(changes)}"
+    yield "health", dict(extra, narrative=narrative)
+    block, size = {"flagged_title": _flagged_title(screened), "flagged": []}, 0
+    for heading, lines in _flagged_groups(screened):
+        for start in range(0, max(len(lines), 1), block_lines):
+            part = lines[start:start + block_lines]
+            if size and size + len(part) > block_lines:
+                yield "health", dict(extra, **block)
+                block, size = {"flagged": []}, 0
+            block["flagged"].append({"heading": heading if start == 0 else f"{heading} (continued)", "lines": part})
+            size += len(part)
+    yield "health", dict(extra, **block)
+
+def generate_health_report(csv_file_path, output_pdf_name="diksha_health_report.pdf", map_reduce=False,
+                           max_workers=REPORT_WORKERS, use_cache=True, incremental=False,
+                           snapshot_path=SNAPSHOT_PATH):
+    """
+    Generate a health report PDF from student data in a CSV file.
     
-    try:
-        response = model.generate_content(prompt)
-        gemini_text = response.text
-    except Exception as e:
-        raise Exception(f"Error generating content with Gemini: {e}")
+    Args:
+        csv_file_path (str): Path to the CSV file containing student data
+        output_pdf_name (str): Name of the output PDF file (default: "diksha_health_report.pdf")
+        map_reduce (bool): Summarize per center and grade, then merge (see report_mapreduce.py).
+            Off by default: the single prompt is one Gemini call whatever the roster size, map-reduce
+            is report_mapreduce.map_reduce_calls(groups) calls
+        max_workers (int): Concurrent Gemini calls in map-reduce mode
+        use_cache (bool): Serve an unchanged roster from the report cache (see report_cache.py)
+        incremental (bool): Re-screen only students whose rows are new or changed since the
+            snapshot at ``snapshot_path``, merge them into it and add a changes paragraph
+            (see health_delta.py)
+        snapshot_path (str): Screening snapshot of the previous incremental run
+    
+    Returns:
+        str: Path to the generated PDF file
+    """
+    changes = snapshot = None
+    if incremental:
+        screened, changes, snapshot = screen_incremental(load_roster(csv_file_path), REQUIRED_COLUMNS, snapshot_path)
+    else:
+        screened = load_screened(csv_file_path)
+    cache = ReportCache()
+    roster_hash = data_hash(screened, REQUIRED_COLUMNS)
+    key = report_key(roster_hash, PROMPT_VERSION, MODEL_NAME, "map_reduce" if map_reduce else "single")
+    # The changes paragraph differs from run to run, so incremental runs reuse only the text
+    if use_cache and not incremental and cache.get_pdf(key):
+        shutil.copyfile(cache.get_pdf(key), output_pdf_name)
+        return output_pdf_name
+    
+    gemini_text = cache.get_text(key) if use_cache else None
+    if gemini_text is None:
+        stats = summarize(screened)
+        try:
+            gemini_text = write_narrative(_gemini_client(), screened, stats, map_reduce, max_workers)
+        except Exception as e:
+            raise Exception(f"Error generating content with Gemini: {e}")
+        cache.put_text(key, gemini_text, roster_hash=roster_hash, source=os.path.abspath(csv_file_path),
+                       students=len(screened), model=MODEL_NAME, prompt_version=PROMPT_VERSION,
+                       mode="map_reduce" if map_reduce else "single")
     
     # Generate PDF
     try:
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.set_font("Arial", size=12)
-        
-        # Split long text into lines
-        for line in gemini_text.split('\n'):
-            pdf.multi_cell(0, 10, line)
-        
-        pdf.output(output_pdf_name)
-        return output_pdf_name
-        
+        # Written block by block, so memory stays flat for reports covering every student
+        stream_report(output_pdf_name, health_report_blocks(gemini_text, screened, changes=changes))
     except Exception as e:
         raise Exception(f"Error generating PDF: {e}")
+    if incremental:
+        # Only now, so a failed Gemini call or render leaves the delta for the retry
+        save_snapshot(snapshot, snapshot_path)
+    else:
+        cache.put_pdf(key, output_pdf_name)
+    return output_pdf_name
+
+def invalidate_health_report_cache(csv_file_path=None, key=None):
+    """
+    Drop cached health reports so the next run calls Gemini again.
+    
+    Args:
+        csv_file_path (str): Only the reports built from this roster (any model, prompt version or mode)
+        key (str): Only this cache entry
+    
+    Returns:
+        int: Number of cached reports removed (all of them when no argument is given)
+    """
+    roster_hash = data_hash(load_screened(csv_file_path), REQUIRED_COLUMNS) if csv_file_path else None
+    return ReportCache().invalidate(key=key, roster_hash=roster_hash)
+
+def generate_center_reports(csv_file_path, output_dir="center_health_reports", workers=None,
+                            max_workers=REPORT_WORKERS, combined_pdf=None):
+    """
+    Generate one health report PDF per center.
+    
+    Narratives are requested from Gemini for up to ``max_workers`` centers at a
+    time; the PDFs are then rendered in a pool of ``workers`` processes.
+    
+    Args:
+        csv_file_path (str): Path to the CSV file containing student data
+        output_dir (str): Folder for the <center>_health_report.pdf files
+        workers (int): Rendering processes (default: one per CPU)
+        max_workers (int): Concurrent Gemini calls
+        combined_pdf (str): Also join the center reports into this file, without re-rendering them
+    
+    Returns:
+        list: One {"path", "error", "seconds"} result per center
+    """
+    client = _gemini_client()
+    screened = load_screened(csv_file_path)
+    # Roll numbers without a center prefix get an "Unknown" report instead of none at all
+    centers = [(group_label(center), group) for center, group in screened.groupby("Center", sort=True, dropna=False)]
+    unknown = int(screened["Center"].isna().sum())
+    if unknown:
+        logger.warning(f"{unknown} students have no center prefix in their Roll No; "
+                       f"they are reported in {group_label(None)}_health_report.pdf")
+    
+    def narrative(item):
+        center, group = item
+        return write_narrative(client, group, summarize(group, group_cols=("Grade",)), max_workers=max_workers)
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        narratives = list(pool.map(narrative, centers))
+    
+    jobs = []
+    for (center, group), text in zip(centers, narratives):
+        data = health_report_data(text, group, title=f"Diksha Foundation Health Report - {center}")
+        jobs.append(("health", data, os.path.join(output_dir, f"{center}_health_report.pdf")))
+    results = render_batch(jobs, workers)
+    if combined_pdf:
+        stream_report(combined_pdf, [r["path"] for r in results if not r["error"]])
+    return results
 
 # Example usage
 if __name__ == "__main__":
@@ -127,7 +272,7 @@ if __name__ == "__main__":
     # For the existing Excel file, you can convert it first:
     try:
         # Convert Excel to CSV if needed
-        df = pd.read_excel("complete_data.xlsx")
+        df = read_workbook("complete_data.xlsx")
         df.to_csv("complete_data.csv", index=False)
         
         # Generate report
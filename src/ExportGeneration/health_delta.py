@@ -0,0 +1,118 @@
+"""
+Incremental health screening against the previous run's snapshot.
+
+The snapshot is the last screened table plus a hash of each student's input
+row (the REQUIRED_COLUMNS of AdminPDF). screen_incremental() compares the
+current roster with it by Roll No, screens only the new and changed rows,
+takes every unchanged row's results from the snapshot, drops students who
+left, and returns the merged table as the next snapshot. The caller saves
+it with save_snapshot() only once the report is written, so a failed run
+keeps the previous snapshot and the retry still reports the whole delta.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from student_data import read_frame, write_frame
+
+from health_screening import AGE_GROUPS, GRADE_BINS, screen_students
+
+SNAPSHOT_PATH = os.getenv(
+    "HEALTH_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "health_snapshot"),
+)
+
+KEY_COLUMN = "_row_key"
+HASH_COLUMN = "_row_hash"
+
+
+def row_keys(df):
+    """Roll No, with "#2", "#3"... on repeats, so duplicate roll numbers still match up"""
+    roll = df["Roll No"].astype(str)
+    repeat = roll.duplicated()
+    if repeat.any():
+        roll = roll.copy()
+        number = roll[repeat].groupby(roll[repeat]).cumcount() + 2
+        roll[repeat] = roll[repeat] + "#" + number.astype(str)
+    return roll
+
+
+def row_hashes(df, columns):
+    """Hash of each row's inputs and of the screening rules, so editing AGE_GROUPS re-screens everyone"""
+    rules = pd.util.hash_array(np.array([AGE_GROUPS.to_csv() + repr(GRADE_BINS)], dtype=object))[0]
+    return pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy() ^ rules
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """The previous run's screened table, or None"""
+    for fmt, ext in (("feather", ".feather"), ("pickle", ".pkl")):
+        if os.path.exists(path + ext):
+            return read_frame(path, fmt)
+    return None
+
+
+def save_snapshot(screened, path=SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for ext in (".feather", ".pkl"):
+        if os.path.exists(path + ext):
+            os.remove(path + ext)
+    write_frame(screened, path)
+
+
+def screen_incremental(df, columns, snapshot_path=SNAPSHOT_PATH):
+    """Screen ``df`` reusing the snapshot's results for unchanged rows
+
+    Args:
+        df (pd.DataFrame): Current roster (with Center columns added)
+        columns (list): Input columns whose change means a row is re-screened
+        snapshot_path (str): Snapshot file, without extension
+
+    Returns:
+        tuple: (screened frame in ``df`` order, {"new", "changed", "removed",
+        "unchanged", "newly_flagged", "no_longer_flagged"} counts, snapshot
+        for save_snapshot())
+    """
+    current = df.reset_index(drop=True).assign(**{KEY_COLUMN: row_keys(df).to_numpy(),
+                                                  HASH_COLUMN: row_hashes(df, columns)})
+    previous = load_snapshot(snapshot_path)
+    if previous is not None and not set(current.columns) <= set(previous.columns):
+        previous = None  # written for a different roster layout
+    if previous is None:
+        previous = current.iloc[:0].assign(Flagged=pd.Series(dtype=bool))
+
+    old = previous.set_index(KEY_COLUMN)
+    old_hash = old[HASH_COLUMN].reindex(current[KEY_COLUMN]).to_numpy()
+    known = current[KEY_COLUMN].isin(old.index).to_numpy()
+    same = known & (old_hash == current[HASH_COLUMN].to_numpy())
+
+    # Only new and changed rows are screened; unchanged rows come from the snapshot
+    screened = screen_students(current[~same])
+    if same.any():
+        reused = old.loc[current.loc[same, KEY_COLUMN]].reset_index()
+        reused.index = current.index[same]
+        screened = pd.concat([screened, reused[screened.columns]]).sort_index()
+
+    was_flagged = old["Flagged"].reindex(current[KEY_COLUMN]).fillna(False).astype(bool).to_numpy()
+    changes = {
+        "new": int((~known).sum()),
+        "changed": int((known & ~same).sum()),
+        "removed": int((~old.index.isin(current[KEY_COLUMN])).sum()),
+        "unchanged": int(same.sum()),
+        "newly_flagged": int((screened["Flagged"].to_numpy() & ~was_flagged).sum()),
+        "no_longer_flagged": int((~screened["Flagged"].to_numpy() & was_flagged & known).sum()),
+    }
+    return screened.drop(columns=[KEY_COLUMN, HASH_COLUMN]), changes, screened
+
+
+def describe_changes(changes):
+    """One plain-text paragraph for the report"""
+    return (
+        f"Changes since the previous screening: {changes['new']} new students, "
+        f"{changes['changed']} with updated height or weight, {changes['removed']} no longer on the roster "
+        f"and {changes['unchanged']} unchanged. {changes['newly_flagged']} students are newly flagged and "
+        f"{changes['no_longer_flagged']} are no longer flagged."
+    )
@@ -0,0 +1,127 @@
+"""
+Deterministic health screening for the AdminPDF report.
+
+Maps each student's grade to an age group, compares height and weight with
+that group's minimums and flags anyone below either, all as vectorized
+pandas/NumPy operations. summarize() reduces the result to a fixed-size set
+of statistics, which is all that needs to go to Gemini for the narrative.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Age group -> expected height (cm) and weight (kg) ranges
+AGE_GROUPS = pd.DataFrame(
+    [
+        ("5-7", 105, 120, 10, 16),
+        ("8-10", 120, 135, 13, 22),
+        ("11-13", 135, 150, 22, 35),
+        ("14-16", 150, 165, 35, 50),
+        ("17+", 165, 175, 45, 60),
+    ],
+    columns=["Age Group", "Min Height (cm)", "Max Height (cm)", "Min Weight (kg)", "Max Weight (kg)"],
+).set_index("Age Group")
+
+# Grade 1-2 -> 5-7, 3-5 -> 8-10, 6-7 -> 11-13, 8-10 -> 14-16, 11+ -> 17+
+GRADE_BINS = [0, 2, 5, 7, 10, np.inf]
+
+UNKNOWN_GROUP = "Unknown"
+
+# How students were screened, for the Gemini prompts
+SCREENING_RULES = f"""Students were screened against these expected ranges, with the age group
+inferred from grade (Grade 1-2 -> 5-7, 3-5 -> 8-10, 6-7 -> 11-13,
+8-10 -> 14-16, 11+ -> 17+). A student is flagged when below the minimum
+height or the minimum weight for their age group.
+
+{AGE_GROUPS.to_string()}"""
+
+
+def grade_number(grade):
+    """Numeric grade from values like 5, '5', 'Grade 5' or '5th'"""
+    numeric = pd.to_numeric(grade, errors="coerce")
+    text = grade.astype("string").str.extract(r"(\d+)", expand=False)
+    return numeric.fillna(pd.to_numeric(text, errors="coerce"))
+
+
+def screen_students(df):
+    """Add Age Group, minimum thresholds and Below Height / Below Weight / Flagged columns.
+
+    Args:
+        df (pd.DataFrame): Needs Grade, Height (cm) and Weight (kg) columns
+
+    Returns:
+        pd.DataFrame: A copy of ``df`` with the screening columns
+    """
+    out = df.copy()
+    grades = grade_number(out["Grade"])
+    groups = pd.cut(grades, bins=GRADE_BINS, labels=AGE_GROUPS.index, right=True)
+    out["Age Group"] = groups.astype("string").fillna(UNKNOWN_GROUP)
+
+    thresholds = AGE_GROUPS[["Min Height (cm)", "Min Weight (kg)"]].reindex(out["Age Group"])
+    out["Min Height (cm)"] = thresholds["Min Height (cm)"].to_numpy()
+    out["Min Weight (kg)"] = thresholds["Min Weight (kg)"].to_numpy()
+
+    height = pd.to_numeric(out["Height (cm)"], errors="coerce")
+    weight = pd.to_numeric(out["Weight (kg)"], errors="coerce")
+    # NaN comparisons are False: missing measurements or grades are never flagged
+    out["Below Height"] = (height < out["Min Height (cm)"]).to_numpy()
+    out["Below Weight"] = (weight < out["Min Weight (kg)"]).to_numpy()
+    out["Flagged"] = out["Below Height"] | out["Below Weight"]
+    out["Missing Data"] = (height.isna() | weight.isna() | (out["Age Group"] == UNKNOWN_GROUP)).to_numpy()
+    return out
+
+
+def group_label(value):
+    """A center or grade as shown in reports; missing ones (a Roll No without a center prefix) are UNKNOWN_GROUP"""
+    return UNKNOWN_GROUP if pd.isna(value) else value
+
+
+def summarize(screened, group_cols=("Center", "Grade")):
+    """Fixed-size statistics of a screened roster, safe to send to an LLM (no names)"""
+    height = pd.to_numeric(screened["Height (cm)"], errors="coerce")
+    weight = pd.to_numeric(screened["Weight (kg)"], errors="coerce")
+    total = len(screened)
+    flagged = int(screened["Flagged"].sum())
+
+    by_group = screened.groupby("Age Group", observed=True).agg(
+        students=("Flagged", "size"),
+        flagged=("Flagged", "sum"),
+        below_height=("Below Height", "sum"),
+        below_weight=("Below Weight", "sum"),
+    )
+    by_group["avg_height_cm"] = height.groupby(screened["Age Group"]).mean().round(1)
+    by_group["avg_weight_kg"] = weight.groupby(screened["Age Group"]).mean().round(1)
+
+    summary = {
+        "students": total,
+        "flagged": flagged,
+        "flagged_percent": round(100.0 * flagged / total, 1) if total else 0.0,
+        "below_height": int(screened["Below Height"].sum()),
+        "below_weight": int(screened["Below Weight"].sum()),
+        "below_both": int((screened["Below Height"] & screened["Below Weight"]).sum()),
+        "missing_data": int(screened["Missing Data"].sum()),
+        "by_age_group": _records(by_group),
+    }
+    for column in group_cols:
+        if column in screened.columns:
+            counts = screened.groupby(column, observed=True, dropna=False)["Flagged"].agg(["size", "sum"])
+            counts.columns = ["students", "flagged"]
+            summary[f"by_{column.lower()}"] = _records(counts)
+    return summary
+
+
+def _records(df):
+    """{group: {stat: value}} with plain Python numbers"""
+    return {
+        str(group_label(key)): {
+            k: (None if pd.isna(v) else v.item() if hasattr(v, "item") else v) for k, v in row.items()
+        }
+        for key, row in df.to_dict(orient="index").items()
+    }
+
+
+def flagged_students(screened, group_cols=("Center", "Grade")):
+    """Flagged rows sorted by center and grade, for the list in the PDF"""
+    group_cols = [c for c in group_cols if c in screened.columns]
+    flagged = screened[screened["Flagged"]]
+    return flagged.sort_values(group_cols + ["Roll No"], kind="stable")
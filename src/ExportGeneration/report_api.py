@@ -0,0 +1,310 @@
+"""
+Health report jobs over HTTP for the admin dashboard.
+
+POST /reports takes a roster CSV upload, checks its columns, queues
+AdminPDF.generate_health_report and answers at once with a job id, so the
+dashboard polls GET /reports/<id> instead of holding a connection open for
+the whole generation, and fetches GET /reports/<id>/pdf when it is done.
+
+At most REPORT_JOB_WORKERS reports are generated at a time (each one's
+Gemini calls are further limited by the shared rate limiter), and at most
+REPORT_JOB_QUEUE more wait in line; beyond that uploads get a 503 with
+Retry-After. Uploads and PDFs live under REPORT_JOB_DIR and are removed
+REPORT_JOB_TTL_HOURS after the job finishes.
+
+Jobs are tracked in this process's memory, so run a single uvicorn worker;
+a restart forgets queued jobs (their re-submission is usually a report cache
+hit, see report_cache.py).
+
+Run with: uvicorn report_api:app --host 127.0.0.1 --port 8003
+"""
+
+import datetime
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse
+
+from AdminPDF import REQUIRED_COLUMNS, generate_health_report
+
+REPORT_JOB_DIR = os.getenv(
+    "REPORT_JOB_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "report_jobs"),
+)
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+REPORT_JOB_QUEUE = int(os.getenv("REPORT_JOB_QUEUE", "20"))
+REPORT_JOB_TTL_HOURS = float(os.getenv("REPORT_JOB_TTL_HOURS", "24"))
+REPORT_UPLOAD_MAX_MB = int(os.getenv("REPORT_UPLOAD_MAX_MB", "50"))
+
+UPLOAD_NAME = "roster.csv"
+PDF_NAME = "diksha_health_report.pdf"
+# Seconds a client is asked to wait before polling again or retrying a full queue
+POLL_SECONDS = 5
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class ReportJob:
+    """One uploaded roster and the state of its report"""
+
+    def __init__(self, job_id, incremental=False, map_reduce=False):
+        self.id = job_id
+        self.incremental = incremental
+        self.map_reduce = map_reduce
+        self.status = "queued"
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.finished = None  # time.time() of completion, for expiry
+
+    @property
+    def directory(self):
+        return os.path.join(REPORT_JOB_DIR, self.id)
+
+    @property
+    def csv_path(self):
+        return os.path.join(self.directory, UPLOAD_NAME)
+
+    @property
+    def pdf_path(self):
+        return os.path.join(self.directory, PDF_NAME)
+
+    def to_dict(self, position=None):
+        info = {
+            "job_id": self.id,
+            "status": self.status,
+            "incremental": self.incremental,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "status_url": f"/reports/{self.id}",
+        }
+        if position is not None:
+            info["position"] = position
+        if self.status == "done":
+            info["download_url"] = f"/reports/{self.id}/pdf"
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class ReportJobs:
+    """Queued, running and finished jobs, and the bounded pool that runs them"""
+
+    def __init__(self, workers=REPORT_JOB_WORKERS, queue=REPORT_JOB_QUEUE):
+        self.workers = max(1, workers)
+        self.queue = queue
+        self._jobs = {}
+        self._lock = threading.Lock()
+        # health_delta keeps one snapshot, so incremental runs go one at a time
+        self._snapshot_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report")
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+        return job
+
+    def position(self, job):
+        """Jobs ahead of a queued one, or None once it has started"""
+        if job.status != "queued":
+            return None
+        ahead = 0
+        with self._lock:
+            # Jobs are kept in submission order
+            for other in self._jobs.values():
+                if other is job:
+                    break
+                ahead += other.status == "queued"
+        return ahead
+
+    def counts(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "failed")}
+
+    def reserve(self, incremental=False, map_reduce=False):
+        """A new queued job, or a 503 when the pool and its queue are full"""
+        self.expire()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status in ("queued", "running"))
+            if pending >= self.workers + self.queue:
+                raise HTTPException(status_code=503, detail="Too many reports in progress, try again later",
+                                    headers={"Retry-After": str(POLL_SECONDS * 6)})
+            job = ReportJob(uuid.uuid4().hex, incremental, map_reduce)
+            self._jobs[job.id] = job
+        os.makedirs(job.directory, exist_ok=True)
+        return job
+
+    def discard(self, job):
+        """Forget a job whose upload was rejected"""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def submit(self, job):
+        self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        job.status, job.started_at = "running", _now()
+        start = time.time()
+        try:
+            kwargs = {"incremental": job.incremental, "map_reduce": job.map_reduce}
+            if job.incremental:
+                with self._snapshot_lock:
+                    generate_health_report(job.csv_path, job.pdf_path, **kwargs)
+            else:
+                generate_health_report(job.csv_path, job.pdf_path, **kwargs)
+            job.status = "done"
+            logger.info(f"Report {job.id} done in {time.time() - start:.1f}s")
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+            logger.error(f"Report {job.id} failed: {e}")
+        finally:
+            job.finished_at, job.finished = _now(), time.time()
+            # The upload is not needed once the report exists
+            if os.path.exists(job.csv_path):
+                os.remove(job.csv_path)
+
+    def expire(self):
+        """Drop finished jobs older than REPORT_JOB_TTL_HOURS and their files"""
+        cutoff = time.time() - REPORT_JOB_TTL_HOURS * 3600
+        with self._lock:
+            old = [job for job in self._jobs.values() if job.finished is not None and job.finished < cutoff]
+            for job in old:
+                del self._jobs[job.id]
+        for job in old:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+jobs = ReportJobs()
+
+app = FastAPI(
+    title="Health Report API",
+    description="Queued health report generation from roster CSV uploads",
+    version="1.0.0"
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[
+        "http://localhost:5173",
+        "http://localhost:5174",
+        "http://127.0.0.1:5173",
+        "http://127.0.0.1:5174",
+        "http://localhost:3000"
+    ],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["*"],
+    expose_headers=["Location", "Retry-After"],
+)
+
+
+def save_upload(upload, path):
+    """Copy an upload to ``path`` in chunks, refusing files over REPORT_UPLOAD_MAX_MB"""
+    size, limit = 0, REPORT_UPLOAD_MAX_MB << 20
+    with open(path, "wb") as f:
+        while True:
+            chunk = upload.file.read(1 << 20)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                raise HTTPException(status_code=413, detail=f"CSV larger than {REPORT_UPLOAD_MAX_MB} MB")
+            f.write(chunk)
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Empty CSV upload")
+
+
+def check_columns(path):
+    """Reject a CSV without the health columns now rather than after queueing it"""
+    try:
+        columns = pd.read_csv(path, nrows=0).columns
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error reading CSV file: {e}")
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {missing}")
+
+
+@app.post("/reports", status_code=202)
+async def create_report(file: UploadFile = File(...), incremental: bool = False, map_reduce: bool = False):
+    """Queue a health report for an uploaded roster CSV; returns the job to poll"""
+    # Disk and pandas work runs in the threadpool, keeping the event loop free for polling clients
+    job = await run_in_threadpool(jobs.reserve, incremental, map_reduce)
+    try:
+        await run_in_threadpool(save_upload, file, job.csv_path)
+        await run_in_threadpool(check_columns, job.csv_path)
+    except Exception:
+        await run_in_threadpool(jobs.discard, job)
+        raise
+    jobs.submit(job)
+    logger.info(f"Queued report {job.id} for {file.filename}")
+    return JSONResponse(status_code=202, content=job.to_dict(jobs.position(job)),
+                        headers={"Location": f"/reports/{job.id}", "Retry-After": str(POLL_SECONDS)})
+
+
+@app.get("/reports/{job_id}")
+async def report_status(job_id: str):
+    """Status of a report job: queued (with its place in line), running, done or failed"""
+    job = jobs.get(job_id)
+    headers = {"Retry-After": str(POLL_SECONDS)} if job.status in ("queued", "running") else {}
+    return JSONResponse(content=job.to_dict(jobs.position(job)), headers=headers)
+
+
+@app.get("/reports/{job_id}/pdf")
+async def report_pdf(job_id: str):
+    """The finished report; 409 while the job is still queued or running"""
+    job = jobs.get(job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Report failed: {job.error}")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Report is {job.status}",
+                            headers={"Retry-After": str(POLL_SECONDS)})
+    return FileResponse(job.pdf_path, media_type="application/pdf", filename=PDF_NAME)
+
+
+@app.on_event("shutdown")
+def shutdown():
+    jobs.shutdown()
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint with the job counts"""
+    return {"status": "healthy", "workers": jobs.workers, "queue": jobs.queue, "jobs": jobs.counts()}
+
+
+@app.get("/")
+async def root():
+    """Root endpoint with API information"""
+    return {
+        "message": "Health Report API is running",
+        "version": "1.0.0",
+        "endpoints": {
+            "create": "POST /reports (multipart file=<roster.csv>, ?incremental=&map_reduce=)",
+            "status": "/reports/<job_id>",
+            "pdf": "/reports/<job_id>/pdf",
+            "health": "/health"
+        }
+    }
@@ -0,0 +1,120 @@
+"""
+Disk cache of generated health reports.
+
+A report is keyed by a hash of the roster columns it is built from plus the
+prompt template version, the Gemini model and the generation mode, so
+regenerating from an unchanged CSV costs neither a Gemini call nor a PDF
+render. Each entry is a folder holding the generated text, the PDF and a
+small meta.json:
+
+    <REPORT_CACHE_DIR>/<key>/report.txt
+    <REPORT_CACHE_DIR>/<key>/report.pdf
+    <REPORT_CACHE_DIR>/<key>/meta.json
+
+invalidate() drops entries for one key, for one roster (every model, version
+and mode built from it) or all of them.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+REPORT_CACHE_DIR = os.getenv(
+    "REPORT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "health_reports"),
+)
+
+TEXT_NAME = "report.txt"
+PDF_NAME = "report.pdf"
+META_NAME = "meta.json"
+
+
+def data_hash(df, columns):
+    """Order-sensitive hash of the selected columns of a data frame"""
+    subset = df[list(columns)]
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(map(str, subset.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(subset, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def report_key(roster_hash, prompt_version, model_name, mode):
+    digest = hashlib.sha256()
+    for part in (roster_hash, str(prompt_version), model_name, mode):
+        digest.update(part.encode("utf-8") + b"\x1f")
+    return digest.hexdigest()[:32]
+
+
+class ReportCache:
+    """Generated text and PDF per report key, on disk"""
+
+    def __init__(self, directory=REPORT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key, name):
+        return os.path.join(self.directory, key, name)
+
+    def get_text(self, key):
+        """Cached report text, or None"""
+        try:
+            with open(self._path(key, TEXT_NAME), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get_pdf(self, key):
+        """Path of the cached PDF, or None"""
+        path = self._path(key, PDF_NAME)
+        return path if os.path.exists(path) else None
+
+    def put_text(self, key, text, **meta):
+        """Store the text as soon as Gemini returns it, before the PDF is rendered"""
+        os.makedirs(os.path.join(self.directory, key), exist_ok=True)
+        self._write(self._path(key, TEXT_NAME), text.encode("utf-8"))
+        meta = dict(meta, created_at=datetime.datetime.now().isoformat(timespec="seconds"))
+        self._write(self._path(key, META_NAME), json.dumps(meta, indent=2, sort_keys=True).encode("utf-8"))
+
+    def put_pdf(self, key, pdf_path):
+        os.makedirs(os.path.join(self.directory, key), exist_ok=True)
+        partial = self._path(key, PDF_NAME) + ".part"
+        shutil.copyfile(pdf_path, partial)
+        os.replace(partial, self._path(key, PDF_NAME))
+
+    @staticmethod
+    def _write(path, data):
+        partial = path + ".part"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+
+    def entries(self):
+        """{key: meta} for every cached report"""
+        entries = {}
+        if not os.path.isdir(self.directory):
+            return entries
+        for key in sorted(os.listdir(self.directory)):
+            try:
+                with open(self._path(key, META_NAME), encoding="utf-8") as f:
+                    entries[key] = json.load(f)
+            except (FileNotFoundError, ValueError):
+                entries[key] = {}
+        return entries
+
+    def invalidate(self, key=None, roster_hash=None):
+        """Remove one entry (``key``), every entry of a roster (``roster_hash``) or, with neither, all.
+
+        Returns the number of entries removed.
+        """
+        if key is not None:
+            keys = [key] if os.path.isdir(os.path.join(self.directory, key)) else []
+        elif roster_hash is not None:
+            keys = [k for k, meta in self.entries().items() if meta.get("roster_hash") == roster_hash]
+        else:
+            keys = list(self.entries())
+        for k in keys:
+            shutil.rmtree(os.path.join(self.directory, k), ignore_errors=True)
+        return len(keys)
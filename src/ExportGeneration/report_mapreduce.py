@@ -0,0 +1,154 @@
+"""
+Opt-in map-reduce generation of the AdminPDF health narrative.
+
+The screened roster is split by center and grade. Each chunk's statistics are
+summarized by Gemini concurrently (at most ``max_workers`` calls in flight),
+the partial summaries are merged ``fanout`` at a time until few enough remain,
+and a final call writes the report from the overall statistics plus those
+merged findings. Every prompt is bounded in size, and the number of calls
+depends on the number of center/grade groups rather than on the number of
+students.
+
+It is not the default: the single prompt AdminPDF sends is already bounded by
+the number of groups (only aggregates go to Gemini), and costs one call. Map-
+reduce costs map_reduce_calls(groups) calls instead, e.g. 40 for 36 groups,
+which under the shared GEMINI_RPM limit (15 by default) means minutes of
+queueing. Use it only when the per-group statistics no longer fit one prompt.
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from rate_limiter import PRIORITY_BATCH
+
+from health_screening import SCREENING_RULES, summarize
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "4"))
+# Partial summaries combined per merge call
+REDUCE_FANOUT = int(os.getenv("REPORT_REDUCE_FANOUT", "12"))
+
+CHUNK_COLUMNS = ("Center", "Grade")
+
+
+def split_chunks(screened, by=CHUNK_COLUMNS):
+    """[(label, frame)] per center/grade group, in sorted order"""
+    by = [c for c in by if c in screened.columns]
+    if not by:
+        return [("All students", screened)]
+    chunks = []
+    for key, group in screened.groupby(by, sort=True, dropna=False):
+        key = key if isinstance(key, tuple) else (key,)
+        chunks.append((", ".join(f"{col} {val}" for col, val in zip(by, key)), group))
+    return chunks
+
+
+def map_reduce_calls(groups, fanout=REDUCE_FANOUT):
+    """Gemini calls generate_narrative makes for ``groups`` center/grade groups"""
+    fanout = max(2, fanout)
+    calls = groups + 1  # one per group, then the final report
+    while groups > fanout:
+        merges = -(-groups // fanout)
+        calls += merges - (groups % fanout == 1)  # a batch of one is passed through
+        groups = merges
+    return calls
+
+
+def _map_prompt(label, stats):
+    return f"""
+You are a admin working for the Diksha Foundation.
+
+{SCREENING_RULES}
+
+Screening results for {label} (computed exactly, as JSON):
+
+{json.dumps(stats, indent=2)}
+
+In at most 4 sentences, summarize how many students in {label} fall below the
+health standards and which age groups and measurements are most affected.
+Plain text only, no lists, no markdown.
+"""
+
+
+def _reduce_prompt(findings):
+    joined = "\n\n".join(findings)
+    return f"""
+You are a admin working for the Diksha Foundation.
+
+Below are health screening findings for several groups of students:
+
+{joined}
+
+Merge them into one paragraph of at most 8 sentences. Keep every number that
+matters, name the groups with the most flagged students, and do not invent
+figures. Plain text only, no lists, no markdown.
+"""
+
+
+def _generate(client, prompt):
+    # Report generation yields to live chats sharing the same API key
+    return client.generate_text(prompt, priority=PRIORITY_BATCH)
+
+
+def map_chunks(client, chunks, max_workers=REPORT_WORKERS):
+    """Summarize each (label, frame) chunk concurrently; returns findings in chunk order"""
+    prompts = [(label, _map_prompt(label, summarize(frame, group_cols=()))) for label, frame in chunks]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        texts = pool.map(lambda item: _generate(client, item[1]), prompts)
+        return [f"{label}: {text}" for (label, _), text in zip(prompts, texts)]
+
+
+def reduce_findings(client, findings, fanout=REDUCE_FANOUT, max_workers=REPORT_WORKERS):
+    """Merge findings ``fanout`` at a time, level by level, until at most ``fanout`` remain"""
+    fanout = max(2, fanout)
+    while len(findings) > fanout:
+        batches = [findings[i:i + fanout] for i in range(0, len(findings), fanout)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            findings = list(pool.map(
+                lambda batch: batch[0] if len(batch) == 1 else _generate(client, _reduce_prompt(batch)),
+                batches,
+            ))
+    return findings
+
+
+def generate_narrative(client, screened, stats, max_workers=REPORT_WORKERS, fanout=REDUCE_FANOUT):
+    """Report text for ``screened`` via map (per center/grade) and reduce steps
+
+    Args:
+        client: A gemini_client.GeminiClient
+        screened (pd.DataFrame): Output of health_screening.screen_students
+        stats (dict): summarize(screened), the exact overall figures
+        max_workers (int): Gemini calls in flight at once
+        fanout (int): Partial summaries combined per merge call
+
+    Returns:
+        str: The final report text
+    """
+    findings = map_chunks(client, split_chunks(screened), max_workers)
+    findings = reduce_findings(client, findings, fanout, max_workers)
+    overall = {k: v for k, v in stats.items() if not k.startswith("by_") or k == "by_age_group"}
+    prompt = f"""
+You are a admin working for the Diksha Foundation.
+
+{SCREENING_RULES}
+
+Overall screening results (computed exactly, as JSON):
+
+{json.dumps(overall, indent=2)}
+
+Findings per center and grade:
+
+{chr(10).join(findings)}
+
+Your task:
+
+Generate a clear report with:
+   - Detailed summary: number of students falling below health standards, overall and by age group, center and grade. NO TABLES
+   - General suggestions for health interventions (nutrition, referrals, etc.)
+
+The list of flagged students is added separately, do not invent one.
+Output in structured text format. Give a very detailed summary of the stats. Avoid using markdown format text in answer (no asterisks)
+"""
+    return _generate(client, prompt)
@@ -0,0 +1,43 @@
+"""Manifest and content store upkeep in charts/insights/build_cache.py"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "charts", "insights"))
+from build_cache import BuildCache
+
+
+def render(path):
+    with open(path, "w") as f:
+        f.write("chart")
+
+
+def build(output_dir, centers):
+    cache = BuildCache(output_dir)
+    for center in centers:
+        path = os.path.join(output_dir, center, "chart.png")
+        key = cache.key(render, pd.DataFrame({"Center": [center]}), label=center)
+        if cache.check(path, key):
+            os.makedirs(cache.store_dir, exist_ok=True)
+            render(cache.store_path(key, path))
+            cache.publish(path, key)
+    cache.save()
+    return cache
+
+
+def test_outputs_no_longer_built_leave_the_manifest_and_store(tmp_path):
+    output_dir = str(tmp_path)
+    build(output_dir, ["Bihar", "Patna"])
+    assert len(os.listdir(os.path.join(output_dir, ".store"))) == 2
+
+    cache = build(output_dir, ["Patna"])
+
+    with open(cache.manifest_path) as f:
+        manifest = json.load(f)
+    assert list(manifest["outputs"]) == ["Patna/chart.png"]
+    assert manifest["last_run"]["skipped"] == ["Patna/chart.png"]
+    assert manifest["last_run"]["dropped"] == ["Bihar/chart.png"]
+    assert len(os.listdir(cache.store_dir)) == 1
@@ -0,0 +1,52 @@
+"""Loading converted CSVs with scripts/db_loader.py"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+import db_loader
+
+
+def test_rows_without_student_id_are_counted(tmp_path):
+    csv = tmp_path / "attendance.csv"
+    csv.write_text("student_id,date,status,remarks\n"
+                   "PAT001,2025-01-06,Present,On time\n"
+                   ",2025-01-06,Absent,\n"
+                   "PAT002,2025-01-06,Late,Bus\n")
+    conn = db_loader.connect(str(tmp_path / "school.db"))
+
+    table, rows, skipped, _ = db_loader.load_csv(conn, str(csv))
+
+    assert (table, rows, skipped) == ("attendance", 2, 1)
+    assert conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 2
+
+
+def test_students_need_a_student_id(tmp_path):
+    csv = tmp_path / "students.csv"
+    csv.write_text("firstname,lastname,email,class,gpa,attendance\nAsha,Kumari,asha@example.org,Grade 5-A,3.2,91\n")
+    conn = db_loader.connect(str(tmp_path / "school.db"))
+
+    with pytest.raises(ValueError, match="student_id"):
+        db_loader.load_csv(conn, str(csv))
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO students (student_id, email) VALUES (NULL, 'asha@example.org')")
+
+
+def test_nullable_students_table_is_rebuilt(tmp_path):
+    path = str(tmp_path / "school.db")
+    old = sqlite3.connect(path)
+    old.executescript(db_loader.SCHEMA.replace("student_id TEXT NOT NULL PRIMARY KEY", "student_id TEXT PRIMARY KEY"))
+    old.executemany("INSERT INTO students (student_id, email, center) VALUES (?, ?, ?)",
+                    [("PAT001", "a@example.org", "PAT"), (None, "b@example.org", None),
+                     ("c@example.org", "c@example.org", None)])
+    old.commit()
+    old.close()
+
+    conn = db_loader.connect(path)
+
+    assert conn.execute("SELECT student_id FROM students").fetchall() == [("PAT001",)]
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(students)")}
+    assert {"idx_students_center", "idx_students_grade"} <= indexes
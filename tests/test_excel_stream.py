@@ -0,0 +1,46 @@
+"""Chunked conversion in scripts/excel_stream.py"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from excel_stream import iter_chunks, stream_to_csv
+from schemas import GRADES, ValidationReport
+
+HEADER = "student_id,subject,grade,marks,date"
+
+
+def test_header_written_once_after_leading_blank_chunk(tmp_path):
+    source = tmp_path / "grades.csv"
+    source.write_text(HEADER + "\n" + "\n" * 4 + "STU001,Maths,A,88,2024-01-20\nSTU002,Maths,B,72,2024-01-20\n")
+    output = tmp_path / "out.csv"
+
+    stats = stream_to_csv(str(source), str(output), chunk_size=2)
+
+    lines = output.read_text().splitlines()
+    assert lines.count(HEADER) == 1
+    assert lines[0] == HEADER
+    assert stats["rows"] == 2
+    assert list(pd.read_csv(output)["student_id"]) == ["STU001", "STU002"]
+
+
+def test_header_written_once_when_schema_rejects_first_chunk(tmp_path):
+    source = tmp_path / "grades.csv"
+    source.write_text(HEADER + "\nSTU001,Maths,A,188,2024-01-20\nSTU002,Maths,A,-1,2024-01-20\n"
+                      "STU003,Maths,B,72,2024-01-20\n")
+    output = tmp_path / "out.csv"
+    report = ValidationReport()
+
+    stream_to_csv(str(source), str(output), lambda chunk: GRADES.apply(chunk, report), chunk_size=2)
+
+    assert output.read_text().splitlines() == [HEADER, "STU003,Maths,B,72,2024-01-20"]
+    assert list(report.errors["line"]) == [2, 3]
+
+
+def test_blank_lines_keep_file_line_numbers(tmp_path):
+    source = tmp_path / "grades.csv"
+    source.write_text(HEADER + "\n\nSTU001,Maths,A,88,2024-01-20\n")
+    chunk = next(iter_chunks(str(source)))
+    assert list(chunk.index + 2) == [3]
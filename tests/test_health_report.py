@@ -0,0 +1,43 @@
+"""Health report content built by src/ExportGeneration/AdminPDF.py"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "ExportGeneration"))
+from AdminPDF import _flagged_groups, _flagged_title
+from health_screening import UNKNOWN_GROUP, screen_students, summarize
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from student_data import add_center_columns
+
+
+def screened_roster(roll_numbers):
+    df = pd.DataFrame({
+        "Roll No": roll_numbers,
+        "Name of the Student": [f"Student {i}" for i in range(len(roll_numbers))],
+        "Grade": [5] * len(roll_numbers),
+        "Height (cm)": [100] * len(roll_numbers),  # below the minimum for grade 5
+        "Weight (kg)": [15] * len(roll_numbers),
+    })
+    return screen_students(add_center_columns(df.astype({"Roll No": str})))
+
+
+def test_flagged_students_without_center_prefix_are_listed():
+    screened = screened_roster(["101", "102", "PAT003", "104"])
+    groups = dict(_flagged_groups(screened))
+
+    listed = sum(len(lines) for lines in groups.values())
+    assert _flagged_title(screened) == "Flagged Students (4 of 4)"
+    assert listed == 4
+    assert len(groups[f"Center {UNKNOWN_GROUP}, Grade 5"]) == 3
+    assert any("Roll No 101" in line for line in groups[f"Center {UNKNOWN_GROUP}, Grade 5"])
+
+
+def test_summary_counts_students_without_center():
+    summary = summarize(screened_roster(["101", "PAT002"]))
+    assert summary["by_center"] == {
+        "PAT": {"students": 1, "flagged": 1},
+        UNKNOWN_GROUP: {"students": 1, "flagged": 1},
+    }
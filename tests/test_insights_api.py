@@ -0,0 +1,36 @@
+"""Filtered statistics from charts/insights/insights_api.py"""
+
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "charts", "insights"))
+import insights_api
+
+client = TestClient(insights_api.app)
+
+
+def test_two_filters_are_applied_to_their_own_columns():
+    version, cube = insights_api.source.current()
+    rows = cube.rows
+    expected = int(((rows["Center_Name"] == "Patna") & (rows["Gender (M/F)"] == "F")).sum())
+
+    response = client.get("/insights", params={"center": "PAT", "gender": "f"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["filters"] == {"center": "Patna", "grade": None, "section": None, "gender": "F"}
+    assert body["students"] == expected
+
+
+def test_grade_and_section_filters_combine():
+    version, cube = insights_api.source.current()
+    rows = cube.rows
+    section = rows.loc[rows["Grade"] == 5, "Section"].dropna().iloc[0]
+    expected = int(((rows["Grade"] == 5) & (rows["Section"] == section)).sum())
+
+    body = client.get("/insights", params={"grade": 5, "section": section.lower()}).json()
+
+    assert body["filters"]["grade"] == 5 and body["filters"]["section"] == section
+    assert body["students"] == expected
@@ -0,0 +1,16 @@
+"""Font handling in backend/report_renderer.py"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from report_renderer import MissingFontError, ReportPDF
+
+
+def test_hindi_without_devanagari_font_fails_loudly():
+    pdf = ReportPDF("Report", {"regular": None, "bold": None, "devanagari": None})
+    assert pdf.text_for_font("Main theek hoon") == "Main theek hoon"
+    with pytest.raises(MissingFontError):
+        pdf.text_for_font("मैं ठीक हूँ")